@@ -1,27 +1,35 @@
 import pandas as pd
 
-from etl.extractors import xml_to_json
+from etl.extractors import cached_xml_to_json
 from etl.loaders.supabase_loader import SupabaseLoader
 from etl.transformers.anthropology import Cultures, transform_anthropology_catalogue
 
 if __name__ == "__main__":
     # Extract
-    records = xml_to_json("data/raw-data/anthropology_catalogue.xml")
+    records = cached_xml_to_json("data/raw-data/anthropology_catalogue.xml")
     df = pd.DataFrame(records).fillna("")
 
+    # One cultures fetch (from the local Airtable snapshot) serves both the
+    # matching and the cultures table
+    cultures = Cultures(incremental=True, check_deletions=True)
+
     # Transform -> returns (catalogue_df, join_df)
-    catalogue_df, join_df = transform_anthropology_catalogue(df)
+    catalogue_df, join_df = transform_anthropology_catalogue(df, cultures)
 
     # Get cultures df
-    cultures_df = Cultures().get_cultures_dataframe()
+    cultures_df = cultures.get_cultures_dataframe()
 
     # Load
     loader = SupabaseLoader()
     loader.load_dataframe(
-        "anthropology_catalogue", catalogue_df, upsert=True, primary_key="irn"
+        "anthropology_catalogue",
+        catalogue_df,
+        upsert=True,
+        primary_key="irn",
+        delta=True,
     )
     loader.load_dataframe(
-        "anthropology_cultures", cultures_df, primary_key="id", upsert=True
+        "anthropology_cultures", cultures_df, primary_key="id", upsert=True, delta=True
     )
     loader.sync_join_table(
         "anthropology_catalogue_cultures_join",
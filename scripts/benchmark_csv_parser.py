@@ -0,0 +1,108 @@
+"""
+Micro-benchmark for the CSV extractor engines.
+
+Writes a synthetic biology catalogue CSV (same columns as the EMu export) and
+a synthetic GBIF occurrence.txt to a temporary directory, then times
+`read_csv` with the C parser, the pyarrow engine, and the pyarrow engine with
+typed and dictionary-encoded columns.
+
+Run from the repository root:
+    python scripts/benchmark_csv_parser.py            # 1M catalogue rows
+    python scripts/benchmark_csv_parser.py 200000     # custom size
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from etl.extractors.csv_parser import read_csv
+
+CATALOGUE_HEADER = (
+    '"operation","date_emu_record_modified","irn","emu_guid","department",'
+    '"catalogue_number","type_status","sex","life_stage","side","element_group",'
+    '"element","locality","locality_irn","taxon_irn"\n'
+)
+DEPARTMENTS = ["Dinosaur Institute", "Mammalogy", "Ornithology", "Herpetology"]
+TYPE_STATUSES = ["", "", "", "Holotype", "Paratype"]
+
+OCCURRENCE_COLUMNS = [
+    "gbifID",
+    "occurrenceID",
+    "taxonKey",
+    "basisOfRecord",
+    "countryCode",
+    "locality",
+    "eventDate",
+]
+
+CATALOGUE_DTYPE = {
+    "irn": "int64",
+    "date_emu_record_modified": "date32",
+    "department": "category",
+    "type_status": "category",
+}
+
+
+def write_synthetic_catalogue(path: Path, n_rows: int) -> None:
+    """Writes a synthetic biology catalogue CSV with n_rows records."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(CATALOGUE_HEADER)
+        for i in range(n_rows):
+            f.write(
+                f'"UPDATE","2023-04-{i % 28 + 1:02d}","{i}",'
+                f'"00000000-0000-0000-0000-{i:012d}","{DEPARTMENTS[i % 4]}",'
+                f'"LACM-DI {i}","{TYPE_STATUSES[i % 5]}","","","L","",'
+                f'"femur {i % 50}","DILACM{i % 900} : Morrison : Utah : USA",'
+                f'"{i % 900}","{i % 5000}"\n'
+            )
+
+
+def write_synthetic_occurrences(path: Path, n_rows: int) -> None:
+    """Writes a synthetic tab-separated GBIF occurrence.txt with n_rows records."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\t".join(OCCURRENCE_COLUMNS) + "\n")
+        for i in range(n_rows):
+            f.write(
+                f"{i}\t00000000-0000-0000-0000-{i:012d}\t{i % 50_000}\t"
+                f"PRESERVED_SPECIMEN\tUS\tSome locality {i % 977}\t2001-01-01\n"
+            )
+
+
+def time_read(label: str, **kwargs) -> None:
+    """Reads a file with read_csv and prints the elapsed time."""
+    start = time.perf_counter()
+    df = read_csv(**kwargs)
+    elapsed = time.perf_counter() - start
+    memory_mb = df.memory_usage(deep=True).sum() / 1_000_000
+    print(f" {label:<28} {elapsed:6.2f}s  {len(df):>10,} rows  {memory_mb:7,.0f} MB")
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalogue = Path(tmp) / "biology_catalogue.csv"
+        occurrences = Path(tmp) / "occurrence.txt"
+        write_synthetic_catalogue(catalogue, n_rows)
+        write_synthetic_occurrences(occurrences, n_rows * 3)
+
+        print(f"Catalogue ({catalogue.stat().st_size / 1_000_000:,.0f} MB):")
+        time_read("c", file_path=str(catalogue))
+        time_read("pyarrow", file_path=str(catalogue), engine="pyarrow")
+        time_read(
+            "pyarrow, typed",
+            file_path=str(catalogue),
+            dtype=CATALOGUE_DTYPE,
+            engine="pyarrow",
+        )
+
+        print(f"occurrence.txt ({occurrences.stat().st_size / 1_000_000:,.0f} MB):")
+        occurrence_kwargs = {
+            "file_path": str(occurrences),
+            "delimiter": "\t",
+            "columns": ["occurrenceID", "taxonKey", "gbifID"],
+            "dtype": {"occurrenceID": str, "taxonKey": str, "gbifID": str},
+        }
+        time_read("c", **occurrence_kwargs)
+        time_read("pyarrow", engine="pyarrow", **occurrence_kwargs)
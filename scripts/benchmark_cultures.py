@@ -0,0 +1,148 @@
+"""
+Micro-benchmark for matching catalogue motifs to cultures.
+
+Builds a synthetic cultures table (with a parent hierarchy) and a synthetic
+anthropology catalogue whose cultural attributions repeat a few thousand
+distinct motifs, as the EMu export does, then times Cultures.match_list per
+catalogue row:
+
+- uncached: every motif is parsed and looked up again (the original path)
+- cached: each distinct motif is parsed once and then answered from memory
+
+and building the catalogue/cultures join table for the whole catalogue:
+
+- iterrows: match_list per row with one dict per join row, as
+  transform_anthropology_catalogue originally did
+- match_series: the batch API it uses now
+
+Run from the repository root:
+    python scripts/benchmark_cultures.py              # 300k objects
+    python scripts/benchmark_cultures.py 50000        # custom size
+"""
+
+import random
+import sys
+import time
+
+import pandas as pd
+
+from etl.transformers.anthropology.cultures import Cultures
+
+CULTURE_COLUMNS = [
+    "id",
+    "name",
+    "type",
+    "region",
+    "parent_id",
+    "age_start",
+    "age_end",
+    "synonyms",
+    "endonyms",
+    "aat_id",
+    "wikidata_id",
+    "aat_notes",
+    "description",
+    "record_id",
+    "date_modified",
+]
+QUALIFIERS = ["", "possibly ", "probably ", ""]
+
+
+def synthetic_cultures(n_cultures: int) -> Cultures:
+    """Cultures with names like "Culture 12", each (after the first 50) with a parent."""
+    rng = random.Random(0)
+    rows = [
+        {
+            "id": i,
+            "name": f"Culture {i}",
+            "parent_id": rng.randint(1, min(i - 1, 50)) if i > 50 else "",
+            "record_id": f"rec{i}",
+        }
+        for i in range(1, n_cultures + 1)
+    ]
+    return Cultures(pd.DataFrame(rows, columns=CULTURE_COLUMNS))
+
+
+def synthetic_motifs(n_cultures: int, n_distinct: int) -> list[str]:
+    """Distinct motif strings in the formats catalogue records use."""
+    rng = random.Random(1)
+    motifs = []
+    for i in range(n_distinct):
+        a, b = rng.randint(1, n_cultures), rng.randint(1, n_cultures)
+        qualifier = QUALIFIERS[i % 4]
+        motifs.append(
+            [
+                f"{qualifier}Culture {a}",
+                f"Culture {a}/Culture {b}",
+                f"Culture {a} (Culture {b})",
+                f"{qualifier}Culture {a} style - Culture {b}",
+                f"Unknown {i}",
+            ][i % 5]
+        )
+    return motifs
+
+
+def synthetic_attributions(motifs: list[str], n_objects: int) -> list[list[str]]:
+    """Each object's list of motifs: mostly one, sometimes none or two."""
+    rng = random.Random(2)
+    weights = [1 / (rank + 1) for rank in range(len(motifs))]
+    attributions = []
+    for i in range(n_objects):
+        n = [1, 1, 1, 0, 2][i % 5]
+        attributions.append(rng.choices(motifs, weights=weights, k=n))
+    return attributions
+
+
+def iterrows_join(cultures: Cultures, catalogue: pd.DataFrame) -> pd.DataFrame:
+    """The original transform_anthropology_catalogue loop."""
+    join_rows = []
+    for _, row in catalogue.iterrows():
+        if row["cultural_attribution_verbatim"]:
+            for cid in cultures.match_list(row["cultural_attribution_verbatim"]):
+                join_rows.append({"irn": int(row["irn"]), "cultures_id": int(cid)})
+    return pd.DataFrame(join_rows, columns=["irn", "cultures_id"])
+
+
+if __name__ == "__main__":
+    n_objects = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+
+    cultures = synthetic_cultures(2_000)
+    motifs = synthetic_motifs(2_000, 3_000)
+    attributions = synthetic_attributions(motifs, n_objects)
+    print(f"Matching {n_objects:,} objects ({len(motifs):,} distinct motifs):")
+
+    results = {}
+    for name in ["uncached", "cached"]:
+        if name == "uncached":
+            # Bypass the cache so every motif is parsed again
+            cultures.match = cultures._match_motif
+        else:
+            del cultures.match
+            cultures._motif_matches.clear()
+        start = time.perf_counter()
+        results[name] = [sorted(cultures.match_list(a)) for a in attributions]
+        elapsed = time.perf_counter() - start
+        print(f" {name:<10} {elapsed:6.2f}s  {n_objects / elapsed:>10,.0f} objects/s")
+
+    assert results["uncached"] == results["cached"]
+
+    catalogue = pd.DataFrame(
+        {"irn": range(1, n_objects + 1), "cultural_attribution_verbatim": attributions}
+    )
+    print(f"Building the join table for {n_objects:,} objects:")
+    joins = {}
+    for name in ["iterrows", "match_series"]:
+        cultures._motif_matches.clear()
+        start = time.perf_counter()
+        if name == "iterrows":
+            joins[name] = iterrows_join(cultures, catalogue)
+        else:
+            _, joins[name] = cultures.match_series(
+                catalogue.set_index("irn")["cultural_attribution_verbatim"]
+            )
+        elapsed = time.perf_counter() - start
+        print(f" {name:<12} {elapsed:6.2f}s  {len(joins[name]):,} join rows")
+
+    assert sorted(joins["iterrows"].itertuples(index=False, name=None)) == sorted(
+        joins["match_series"].itertuples(index=False, name=None)
+    )
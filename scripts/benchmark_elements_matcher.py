@@ -0,0 +1,88 @@
+"""
+Micro-benchmark for matching catalogue element strings to Airtable elements.
+
+Builds a synthetic elements table (names with synonyms and a parent
+hierarchy, roughly the size of the Airtable base) and a list of element
+strings like the EMu "element" column, then times:
+
+- scan: testing every lookup key with `key in element`, in priority order
+  (Elements.match's original loop)
+- automaton: Elements.match with the Aho–Corasick matcher
+
+Both must agree on every string. Run from the repository root:
+    python scripts/benchmark_elements_matcher.py             # 500k strings
+    python scripts/benchmark_elements_matcher.py 100000      # custom size
+"""
+
+import random
+import sys
+import time
+
+from etl.transformers.biology.elements.elements import Elements
+
+SIDES = ["", "left ", "right ", "l. ", "r. ", "partial ", "proximal ", "distal "]
+SUFFIXES = ["", " fragment", "?", " (cast)", " and teeth", " frag."]
+
+
+def synthetic_elements(n_elements: int) -> list[dict]:
+    """Airtable-style element records with synonyms and nested children."""
+    rng = random.Random(0)
+    syllables = ["fe", "mur", "ti", "bi", "a", "ul", "na", "ra", "di", "us", "sca"]
+    records = []
+    for i in range(n_elements):
+        name = "".join(rng.choices(syllables, k=rng.randint(2, 5))) + f" {i % 97}"
+        records.append(
+            {
+                "id": f"rec{i}",
+                "fields": {
+                    "id": i + 1,
+                    "name": name,
+                    "synonyms": [f"{name}s", f"{name} bone"] if i % 3 == 0 else [],
+                    "children": ["x"] * (i % 4),
+                    "parent_name": [],
+                    "parent_id": [],
+                },
+            }
+        )
+    return records
+
+
+def synthetic_strings(elements: Elements, n_strings: int) -> list[str]:
+    """Element strings: lookup keys with sides and suffixes, plus misses."""
+    rng = random.Random(1)
+    keys = list(elements.lookup)
+    strings = []
+    for i in range(n_strings):
+        key = rng.choice(keys) if i % 10 else "indeterminate"
+        strings.append(f"{rng.choice(SIDES)}{key}{rng.choice(SUFFIXES)}".title())
+    return strings
+
+
+def scan_match(elements: Elements, element: str):
+    cleaned = elements._clean_element(element)
+    for key, value in elements.lookup.items():
+        if key in cleaned:
+            return [value]
+    return []
+
+
+if __name__ == "__main__":
+    n_strings = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    elements = Elements(synthetic_elements(1_000))
+    strings = synthetic_strings(elements, n_strings)
+    print(f"Matching {n_strings:,} strings against {len(elements.lookup):,} keys:")
+
+    timings = {}
+    results = {}
+    for name, match in [
+        ("scan", lambda s: scan_match(elements, s)),
+        ("automaton", elements.match),
+    ]:
+        start = time.perf_counter()
+        results[name] = [match(s) for s in strings]
+        timings[name] = time.perf_counter() - start
+        rate = n_strings / timings[name]
+        print(f" {name:<10} {timings[name]:7.2f}s  {rate:>10,.0f} strings/s")
+
+    assert results["scan"] == results["automaton"]
@@ -0,0 +1,113 @@
+"""
+Latency benchmark for connection reuse in SupabaseLoader.
+
+Starts a local PostgREST-like stub that accepts inserts and answers with the
+created_at/updated_at of each row, then runs several loads in a row (as a
+dump script does) twice:
+
+- fresh: every loader gets its own new httpx.Client, like the loader's
+  original one-client-per-instance behaviour
+- shared: every loader uses shared_http_client(), the current default
+
+and prints how many TCP connections the stub had to accept, and the mean
+and p95 request latency. The first request of each load is reported
+separately, since that is where a new connection is opened. The stub adds
+no latency of its own, so the difference is a lower bound: against Supabase
+each new connection also costs a TLS handshake across the network.
+
+Run from the repository root:
+    python scripts/benchmark_http_client.py              # 5 loads x 50 requests
+    python scripts/benchmark_http_client.py 10 100       # custom size
+"""
+
+import contextlib
+import io
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from etl.loaders.supabase_loader import SupabaseLoader, shared_http_client
+
+
+class StubPostgrest(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.connections = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so connections can be kept alive
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        rows = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        now = "2024-01-01T00:00:00+00:00"
+        payload = json.dumps(
+            [{"created_at": now, "updated_at": now} for _ in rows]
+        ).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def run_loads(url: str, n_loads: int, n_requests: int, shared: bool) -> tuple:
+    """
+    Runs n_loads loads of n_requests single-chunk inserts.
+
+    Returns:
+        Latencies of the first request of each load, and of all the others
+    """
+    first, rest = [], []
+    rows = [{"irn": i} for i in range(1, 11)]
+    for _ in range(n_loads):
+        http_client = shared_http_client() if shared else httpx.Client(http2=True)
+        loader = SupabaseLoader(url=url, key="benchmark-key", http_client=http_client)
+        for i in range(n_requests):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader.insert_rows("biology_catalogue", rows, return_rows=False)
+            (rest if i else first).append(time.perf_counter() - start)
+    return first, rest
+
+
+def describe(latencies: list) -> str:
+    mean_ms = statistics.mean(latencies) * 1000
+    p95_ms = statistics.quantiles(latencies, n=20)[-1] * 1000
+    return f"mean {mean_ms:5.2f} ms  p95 {p95_ms:5.2f} ms"
+
+
+if __name__ == "__main__":
+    n_loads = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    results = {}
+    for name in ["fresh", "shared"]:
+        server = StubPostgrest()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        first, rest = run_loads(url, n_loads, n_requests, shared=name == "shared")
+        results[name] = (first, rest, server.connections)
+        server.shutdown()
+
+    print(f"{n_loads} loads x {n_requests} requests:")
+    for name, (first, rest, connections) in results.items():
+        print(f" {name:<8} {connections} connections")
+        print(f"  first request of a load   {describe(first)}")
+        print(f"  other requests            {describe(rest)}")
@@ -0,0 +1,75 @@
+"""
+Micro-benchmark for preparing DataFrame rows for a Supabase load.
+
+Builds a synthetic frame (strings, floats with NaNs, nullable integers,
+dates and list columns) and times the two ways of getting from a DataFrame
+to request bodies:
+
+- records: df.to_dict("records"), the recursive per-value NaN cleaning
+  and json.dumps per row (the loader's original path)
+- columnar: SupabaseLoader._dataframe_to_rows plus orjson (the current path)
+
+No requests are sent. Run from the repository root:
+    python scripts/benchmark_supabase_loader.py                # 200k x 40
+    python scripts/benchmark_supabase_loader.py 50000 20       # custom size
+"""
+
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.loaders.supabase_loader import SupabaseLoader, _encode_row
+
+
+def synthetic_frame(n_rows: int, n_columns: int) -> pd.DataFrame:
+    """Returns a frame mixing the column types the dump scripts produce."""
+    rng = np.random.default_rng(0)
+    columns = {}
+    for i in range(n_columns):
+        kind = i % 5
+        if kind == 0:
+            values = pd.Series([f"value {j % 1000}" for j in range(n_rows)])
+        elif kind == 1:
+            values = pd.Series(rng.random(n_rows))
+            values[rng.random(n_rows) < 0.3] = np.nan
+        elif kind == 2:
+            values = pd.Series(rng.integers(0, 10**6, n_rows)).astype("Int64")
+            values[rng.random(n_rows) < 0.3] = pd.NA
+        elif kind == 3:
+            values = pd.Series(["2024-06-18"] * n_rows)
+        else:
+            values = pd.Series([["a", "b"] if j % 3 else [] for j in range(n_rows)])
+        columns[f"column_{i}"] = values
+    return pd.DataFrame(columns)
+
+
+def records_path(loader: SupabaseLoader, df: pd.DataFrame) -> list:
+    rows = [
+        {key: loader._replace_nan_with_none(value) for key, value in row.items()}
+        for row in df.to_dict("records")
+    ]
+    return [json.dumps(row, default=str).encode() for row in rows]
+
+
+def columnar_path(loader: SupabaseLoader, df: pd.DataFrame) -> list:
+    return [_encode_row(row) for row in loader._dataframe_to_rows(df)]
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    df = synthetic_frame(n_rows, n_columns)
+    # Only the row preparation is timed, so skip creating a client
+    loader = SupabaseLoader.__new__(SupabaseLoader)
+
+    print(f"Preparing {n_rows:,} rows x {n_columns} columns:")
+    for name, prepare in [("records", records_path), ("columnar", columnar_path)]:
+        start = time.perf_counter()
+        payload = prepare(loader, df)
+        elapsed = time.perf_counter() - start
+        size_mb = sum(len(row) for row in payload) / 1_000_000
+        print(f" {name:<10} {elapsed:6.2f}s  {size_mb:,.0f} MB of JSON")
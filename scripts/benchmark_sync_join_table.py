@@ -0,0 +1,70 @@
+"""
+Micro-benchmark for the diff step of SupabaseLoader.sync_join_table.
+
+Builds a synthetic join table of existing relations and a desired join_df
+that adds and drops a share of them, then times the two ways of working out
+which relations to add and remove:
+
+- iterrows: tuples from join_df.iterrows() and set differences (the
+  loader's original path)
+- merge: int64 frames and an outer merge with an indicator (the current path)
+
+No requests are sent. Run from the repository root:
+    python scripts/benchmark_sync_join_table.py            # 1M relations
+    python scripts/benchmark_sync_join_table.py 200000     # custom size
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SOURCE, TARGET = "catalogue_irn", "culture_id"
+
+
+def synthetic_relations(n_relations: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Returns (desired, existing) with about 5% of relations added and removed."""
+    rng = np.random.default_rng(0)
+    sources = rng.integers(0, n_relations // 3, n_relations)
+    targets = rng.integers(0, 5_000, n_relations)
+    existing = pd.DataFrame({SOURCE: sources, TARGET: targets}).drop_duplicates()
+    desired = existing.sample(frac=0.95, random_state=0)
+    added = pd.DataFrame(
+        {
+            SOURCE: rng.choice(sources, len(existing) // 20),
+            TARGET: rng.integers(5_000, 6_000, len(existing) // 20),
+        }
+    )
+    desired = pd.concat([desired, added], ignore_index=True).astype(float)
+    return desired, existing
+
+
+def iterrows_diff(desired: pd.DataFrame, existing: pd.DataFrame) -> tuple[int, int]:
+    desired_relations = {
+        (int(row[SOURCE]), int(row[TARGET])) for _, row in desired.iterrows()
+    }
+    existing_relations = set(zip(existing[SOURCE], existing[TARGET]))
+    to_add = desired_relations - existing_relations
+    to_remove = existing_relations - desired_relations
+    return len(to_add), len(to_remove)
+
+
+def merge_diff(desired: pd.DataFrame, existing: pd.DataFrame) -> tuple[int, int]:
+    desired = desired[[SOURCE, TARGET]].astype("int64").drop_duplicates()
+    diff = desired.merge(existing, how="outer", indicator=True)
+    to_add = diff.loc[diff["_merge"] == "left_only", [SOURCE, TARGET]]
+    to_remove = diff.loc[diff["_merge"] == "right_only", [SOURCE, TARGET]]
+    return len(to_add), len(to_remove)
+
+
+if __name__ == "__main__":
+    n_relations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    desired, existing = synthetic_relations(n_relations)
+    print(f"Diffing {len(desired):,} desired against {len(existing):,} existing:")
+    for name, diff in [("iterrows", iterrows_diff), ("merge", merge_diff)]:
+        start = time.perf_counter()
+        added, removed = diff(desired, existing)
+        elapsed = time.perf_counter() - start
+        print(f" {name:<10} {elapsed:6.2f}s  +{added:,} -{removed:,}")
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for the EMu XML extractor.
+
+Writes a synthetic EMu export (shaped like the anthropology catalogue, with
+atoms, multi-field tables, single-field tables and named tuples) to a temporary
+directory and reports how many records per second `iter_records` parses.
+
+Run from the repository root:
+    python scripts/benchmark_xml_parser.py            # 500k tuples
+    python scripts/benchmark_xml_parser.py 100000     # custom size
+    python scripts/benchmark_xml_parser.py 500000 8   # parse with 8 worker processes
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from etl.extractors.xml_parser import iter_records
+
+HEADER = """<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE table
+[
+    <!ELEMENT table	(tuple)*>
+    <!ELEMENT tuple	(table|tuple|atom)*>
+    <!ELEMENT atom	(#PCDATA)*>
+]
+>
+<?schema
+    table           ecatalogue
+        date            date_emu_record_modified
+        text short      irn
+        text short      emu_guid
+        text short      catalogue_number
+        text short      department
+        text long       description
+        table           cultural_attribution
+            text short      AntMotif
+        end
+        tuple           AntSiteRef
+            text short      irn
+            table           site_name
+                text short      SitSiteName
+            end
+            text short      site_number
+        end
+        table           CreatorGroup
+            text long       creator
+            text short      CreRole
+        end
+    end
+?>
+<!-- Data -->
+<table name="ecatalogue">
+"""
+
+
+def synthetic_tuple(i: int) -> str:
+    """Returns the XML for one synthetic top-level record."""
+    motifs = "".join(
+        f'<tuple><atom name="AntMotif">Motif {j}</atom></tuple>' for j in range(i % 3)
+    )
+    creators = (
+        '<table name="CreatorGroup"><tuple><atom name="creator">Maker</atom>'
+        '<atom name="CreRole">Manufacturer</atom></tuple></table>'
+        if i % 4 == 0
+        else ""
+    )
+    return (
+        "  <tuple>\n"
+        f'    <atom name="date_emu_record_modified">2024-06-18</atom>\n'
+        f'    <atom name="irn">{i}</atom>\n'
+        f'    <atom name="emu_guid">00000000-0000-0000-0000-{i:012d}</atom>\n'
+        f'    <atom name="catalogue_number">A.{i} &lt;{i % 7}&gt;</atom>\n'
+        '    <atom name="department">Anthropology</atom>\n'
+        f'    <atom name="description">Synthetic object {i}</atom>\n'
+        f'    <table name="cultural_attribution">{motifs}</table>\n'
+        f'    <tuple name="AntSiteRef"><atom name="irn">{i * 2}</atom>'
+        '<table name="site_name"><tuple><atom name="SitSiteName">Site</atom></tuple></table>'
+        f'<atom name="site_number">{i % 100}</atom></tuple>\n'
+        f"    {creators}\n"
+        "  </tuple>\n"
+    )
+
+
+def write_synthetic_export(path: Path, n_tuples: int) -> None:
+    """Writes a synthetic EMu XML export with n_tuples top-level records."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for i in range(n_tuples):
+            f.write(synthetic_tuple(i))
+        f.write("</table>\n")
+
+
+if __name__ == "__main__":
+    n_tuples = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = Path(tmp) / "synthetic_export.xml"
+        write_synthetic_export(xml_file, n_tuples)
+        size_mb = xml_file.stat().st_size / 1_000_000
+
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_records(str(xml_file), workers=workers))
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"Parsed {count:,} records ({size_mb:,.0f} MB) in {elapsed:.2f}s"
+        f" with workers={workers}"
+    )
+    print(f" {count / elapsed:,.0f} records/sec")
@@ -1,3 +1,5 @@
+import pandas as pd
+
 from etl import extractors
 from etl.loaders.supabase_loader import SupabaseLoader
 from etl.transformers.biology.catalogue import transform_biology_catalogue
@@ -8,20 +10,24 @@ from etl.transformers.biology.gbif.main import match_gbif_records
 
 
 # EMu records extraction
-catalogue_records = extractors.read_csv("data/biology_catalogue.csv")
-elements = extractors.fetch_data_from_airtable("Paleo Elements")
-taxonomy = extractors.xml_to_json("data/biology_taxonomy.xml")
+catalogue_records = extractors.cached_read_csv(
+    "data/biology_catalogue.csv",
+    dtype={
+        "irn": "int64",
+        "date_emu_record_modified": "date32",
+        "department": "category",
+        "type_status": "category",
+    },
+    engine="pyarrow",
+)
+elements = extractors.fetch_data_from_airtable(
+    "Paleo Elements", incremental=True, check_deletions=True
+)
+taxonomy = extractors.cached_xml_to_json("data/biology_taxonomy.xml")
 
 
 # GBIF dump extraction
-gbif_occurences = extractors.read_csv(
-    "data/gbif/occurrence.txt",
-    delimiter="\t",
-    columns=["occurrenceID", "taxonKey", "gbifID"],
-    dtype={"occurrenceID": str, "taxonKey": str, "gbifID": str},
-)
-
-gbif_vernacular_names = extractors.read_csv(
+gbif_vernacular_names = extractors.cached_read_csv(
     "data/gbif/gbif_taxonomic_backbone.csv",
     dtype={
         "taxonID": str,
@@ -31,6 +37,25 @@ gbif_vernacular_names = extractors.read_csv(
     },
 )
 
+# occurrence.txt has tens of millions of rows, so stream it and only keep
+# occurrences of catalogued records whose taxon has a vernacular name
+catalogue_guids = set(catalogue_records["emu_guid"])
+vernacular_taxa = set(gbif_vernacular_names["taxonID"])
+gbif_occurences = pd.concat(
+    chunk[
+        chunk["occurrenceID"].isin(catalogue_guids)
+        & chunk["taxonKey"].isin(vernacular_taxa)
+    ]
+    for chunk in extractors.read_csv(
+        "data/gbif/occurrence.txt",
+        delimiter="\t",
+        columns=["occurrenceID", "taxonKey", "gbifID"],
+        dtype={"occurrenceID": str, "taxonKey": str, "gbifID": str},
+        chunksize=1_000_000,
+        engine="pyarrow",
+    )
+)
+
 # Transform EMu data
 taxonomy_df = transform_biology_taxonomy(taxonomy)
 catalogue_df, elements_df, elements_join_df = transform_biology_catalogue(
@@ -51,26 +76,15 @@ catalogue_df, taxonomy_df = match_gbif_records(
 loader = SupabaseLoader()
 
 
-records, operations = loader.load_dataframe(
-    "biology_taxonomy", taxonomy_df, upsert=True
-)
-print(f"\nProcessed {len(records)} total records in biology_taxonomy:")
-print(f" Inserted: {operations['inserted']}")
-print(f" Updated: {operations['updated']}")
+loader.load_dataframe("biology_taxonomy", taxonomy_df, upsert=True, delta=True)
 
-records, operations = loader.load_dataframe(
-    "biology_catalogue", catalogue_df, upsert=True
+loader.load_dataframe(
+    "biology_catalogue", catalogue_df, upsert=True, max_in_flight=4, delta=True
 )
-print(f"\nProcessed {len(records)} total records in biology_catalogue:")
-print(f" Inserted: {operations['inserted']}")
-print(f" Updated: {operations['updated']}")
 
-records, operations = loader.load_dataframe(
-    "biology_elements", elements_df, upsert=True, primary_key="id"
+loader.load_dataframe(
+    "biology_elements", elements_df, upsert=True, primary_key="id", delta=True
 )
-print(f"\nProcessed {len(records)} total records in biology_elements:")
-print(f" Inserted: {operations['inserted']}")
-print(f" Updated: {operations['updated']}")
 
 
 loader.sync_join_table(
@@ -21,7 +21,7 @@ if __name__ == "__main__":
     records = xml_to_json("data/anthropology_catalogue.xml")
     catalogue_df = pd.DataFrame(records).fillna("")
 
-    cultures = Cultures()
+    cultures = Cultures(incremental=True, check_deletions=True)
     cultures_df = cultures.get_cultures_dataframe()
 
     motifs = flatten_field(catalogue_df["cultural_attribution_verbatim"], "AntMotif")
@@ -32,7 +32,7 @@ if __name__ == "__main__":
     matched_cultures = []
     for motif in motif_counts.index:
         matches = cultures.match_list(motif)
-        matches = [cultures.get_name_by_id(id) for id in matches]
+        matches = cultures.names_for_ids(matches)
         matched_cultures.append(matches)
 
     motif_counts["matches"] = matched_cultures
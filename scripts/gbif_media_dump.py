@@ -9,6 +9,9 @@ PATH_TO_GBIF_MEDIA_DUMP.
 It also requires a csv of biology_catalogue records with GBIF IDs to link the media to.
 """
 
+import os
+import tempfile
+
 from config.settings import settings
 import pandas as pd
 from etl.loaders.supabase_loader import SupabaseLoader
@@ -82,16 +85,20 @@ if __name__ == "__main__":
     # Load media and link to biology_catalogue
     loader = SupabaseLoader()
 
-    results = loader.load_dataframe(
-        "media",
-        media,
-        upsert=True,
-        primary_key="dams_id",
-    )
+    # Spill the returned media ids to disk instead of keeping every returned row
+    with tempfile.TemporaryDirectory() as tmp:
+        media_ids_path = os.path.join(tmp, "media_ids.csv")
+        loader.load_dataframe(
+            "media",
+            media,
+            upsert=True,
+            primary_key="dams_id",
+            spill_path=media_ids_path,
+            spill_columns=["dams_id", "id"],
+        )
+        media_records = pd.read_csv(media_ids_path)
 
     # Prepare media_catalogue join table
-    media_records = pd.DataFrame(results[0])
-    media_records = media_records[["dams_id", "id"]]
     media_records.rename(columns={"id": "media_id"}, inplace=True)
 
     media_catalogue = pd.merge(
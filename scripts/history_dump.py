@@ -9,4 +9,6 @@ df = pd.DataFrame(records).fillna("")
 df = transform_history_catalogue(df)
 
 loader = SupabaseLoader()
-loader.load_dataframe("history_catalogue", df, upsert=True, primary_key="irn")
+loader.load_dataframe(
+    "history_catalogue", df, upsert=True, primary_key="irn", delta=True
+)
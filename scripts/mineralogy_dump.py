@@ -25,6 +25,7 @@ loader.load_dataframe(
     taxonomy_df,
     upsert=True,
     primary_key="irn",
+    delta=True,
 )
 
 loader.load_dataframe(
@@ -32,6 +33,7 @@ loader.load_dataframe(
     catalogue_df,
     upsert=True,
     primary_key="irn",
+    delta=True,
 )
 
 loader.load_dataframe(
@@ -39,4 +41,5 @@ loader.load_dataframe(
     specimens_df,
     upsert=True,
     primary_key="specimen_id",
+    delta=True,
 )
@@ -15,6 +15,19 @@ class Settings(BaseSettings):
     # File paths to gbif taxonomic backbone dumps
     path_to_gbif_dumps: str | None = None
 
+    # On-disk cache of parsed EMu/GBIF extracts (see etl.extractors.cache)
+    extract_cache_dir: str | None = None
+    extract_cache_max_bytes: int | None = None
+
+    # Local snapshots of Airtable tables (see etl.extractors.airtable_snapshot)
+    airtable_snapshot_dir: str | None = None
+
+    # Row hash manifests for delta loads (see etl.loaders.manifest)
+    load_manifest_dir: str | None = None
+
+    # Direct Postgres connection string for COPY loads (see etl.loaders.postgres_copy)
+    supabase_db_url: str | None = None
+
     # Use pydantic v2 style model_config with SettingsConfigDict
     model_config: SettingsConfigDict = SettingsConfigDict(env_file=".env")
 
@@ -1,5 +1,18 @@
 from .csv_parser import read_csv
-from .xml_parser import xml_to_json
+from .xml_parser import iter_records, xml_to_arrow, xml_to_json, xml_to_parquet
 from .airtable_fetcher import fetch_data_from_airtable
+from .airtable_snapshot import AirtableSnapshot
+from .cache import ExtractCache, cached_read_csv, cached_xml_to_json
 
-__all__ = ["read_csv", "xml_to_json", "fetch_data_from_airtable"]
+__all__ = [
+    "read_csv",
+    "xml_to_json",
+    "iter_records",
+    "xml_to_arrow",
+    "xml_to_parquet",
+    "fetch_data_from_airtable",
+    "AirtableSnapshot",
+    "ExtractCache",
+    "cached_xml_to_json",
+    "cached_read_csv",
+]
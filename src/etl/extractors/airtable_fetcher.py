@@ -2,13 +2,21 @@ from pyairtable import Table
 
 from config.settings import settings
 
+from .airtable_snapshot import AirtableSnapshot
 
-def fetch_data_from_airtable(table_name: str) -> list[dict]:
+
+def fetch_data_from_airtable(
+    table_name: str, incremental: bool = False, check_deletions: bool = False
+) -> list[dict]:
     """
     Fetch records from a specified Airtable table.
 
     Args:
         table_name (str): The name of the Airtable table to fetch data from.
+        incremental (bool): If True, keep a local snapshot of the table and only
+            fetch records modified since the last sync (see AirtableSnapshot).
+        check_deletions (bool): With incremental, also drop records deleted since
+            the last sync, at the cost of listing every record id.
     Returns:
         list[dict]: A list of records from the Airtable table.
     Raises:
@@ -25,4 +33,6 @@ def fetch_data_from_airtable(table_name: str) -> list[dict]:
         )
 
     table = Table(api_key, base_id, table_name)
+    if incremental:
+        return AirtableSnapshot(table, check_deletions=check_deletions).sync()
     return table.all()
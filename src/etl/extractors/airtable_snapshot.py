@@ -0,0 +1,138 @@
+"""
+Local snapshot of an Airtable table, refreshed incrementally.
+
+The first sync fetches every record and writes them to a JSON file. Later
+syncs only request records whose LAST_MODIFIED_TIME() is after the previous
+sync and merge them into the snapshot, so syncing an unchanged table costs a
+single request.
+
+LAST_MODIFIED_TIME() ignores computed fields, so a lookup that changes
+because a linked record was edited is not picked up, and deleted records
+don't show up at all. Snapshots older than full_refresh_after (counted from
+their last full fetch) are therefore refetched in full. With
+check_deletions=True, every sync also lists the ids of all records (with a
+single small field) to drop deleted ones straight away; that pages through
+the whole table.
+
+Typical usage:
+    >>> from pyairtable import Table
+    >>> from etl.extractors import AirtableSnapshot
+    >>> records = AirtableSnapshot(Table(api_key, base_id, "Paleo Elements")).sync()
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from pyairtable import Table
+from pyairtable.formulas import IS_AFTER, LAST_MODIFIED_TIME, to_formula_str
+
+from config.settings import settings
+
+DEFAULT_SNAPSHOT_DIR = "data/.airtable"
+
+# Records modified this long before a sync started are fetched again on the
+# next sync, to absorb clock skew between this machine and Airtable
+CLOCK_SKEW = timedelta(minutes=5)
+
+
+class AirtableSnapshot:
+    """Keeps a local JSON copy of an Airtable table in sync."""
+
+    def __init__(
+        self,
+        table: Table,
+        snapshot_dir: str | None = None,
+        id_field: str = "name",
+        full_refresh_after: timedelta = timedelta(days=7),
+        check_deletions: bool = False,
+    ) -> None:
+        """
+        Initialize the snapshot for a table.
+
+        Args:
+            table: pyairtable Table to mirror.
+            snapshot_dir: Directory for snapshot files. Defaults to
+                settings.airtable_snapshot_dir, then to data/.airtable
+            id_field: Field requested when listing record ids to detect deletions.
+                Any field that exists works; a short one keeps responses small.
+            full_refresh_after: Age after which a snapshot is refetched in full.
+            check_deletions: List every record id on incremental syncs to drop
+                deleted records. Otherwise deletions are only picked up by the
+                next full refresh.
+        """
+        self.table = table
+        self.id_field = id_field
+        self.full_refresh_after = full_refresh_after
+        self.check_deletions = check_deletions
+        snapshot_dir = Path(
+            snapshot_dir or settings.airtable_snapshot_dir or DEFAULT_SNAPSHOT_DIR
+        )
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        # Keyed by base as well, so tables with the same name in two bases
+        # (e.g. a staging copy) keep separate snapshots
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", table.name).strip("_").lower()
+        self.path = snapshot_dir / f"{table.base.id}_{slug}.json"
+
+    def load(self) -> Dict[str, Any] | None:
+        """Returns the stored snapshot, or None if there is none (or it is unreadable)."""
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, snapshot: Dict[str, Any]) -> None:
+        """Writes the snapshot to a temporary file and then moves it into place."""
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        os.replace(tmp_path, self.path)
+
+    def sync(self, full: bool = False) -> List[Dict[str, Any]]:
+        """
+        Brings the snapshot up to date and returns its records.
+
+        Args:
+            full: Refetch every record instead of only the changed ones.
+
+        Returns:
+            The table's records, in the same form as Table.all(). Records keep
+            the order of the last full fetch; new records are appended.
+        """
+        started = datetime.now(timezone.utc)
+        snapshot = None if full else self.load()
+        if snapshot is not None:
+            full_synced_at = datetime.fromisoformat(snapshot["full_synced_at"])
+            if started - full_synced_at > self.full_refresh_after:
+                snapshot = None
+
+        if snapshot is None:
+            full_synced_at = started
+            records = {record["id"]: record for record in self.table.all()}
+        else:
+            synced_at = datetime.fromisoformat(snapshot["synced_at"])
+            records = snapshot["records"]
+            formula = IS_AFTER(LAST_MODIFIED_TIME(), synced_at - CLOCK_SKEW)
+            for record in self.table.all(formula=to_formula_str(formula)):
+                records[record["id"]] = record
+
+            if self.check_deletions:
+                existing = {
+                    record["id"] for record in self.table.all(fields=[self.id_field])
+                }
+                records = {
+                    record_id: record
+                    for record_id, record in records.items()
+                    if record_id in existing
+                }
+
+        self.save(
+            {
+                "synced_at": started.isoformat(),
+                "full_synced_at": full_synced_at.isoformat(),
+                "records": records,
+            }
+        )
+        return list(records.values())
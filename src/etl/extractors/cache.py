@@ -0,0 +1,249 @@
+"""
+On-disk cache of parsed extracts, keyed by the fingerprint of the raw export.
+
+Re-running a dump script against an unchanged export reloads the parsed result
+from an Arrow IPC file instead of parsing the XML/CSV again. Entries are keyed
+on the export's path and the extractor arguments, and are only used when the
+export's size, mtime (or, failing that, content hash) still match. The cache
+is trimmed to a maximum size by evicting the least recently used entries.
+
+Typical usage:
+    >>> from etl.extractors import cached_xml_to_json, cached_read_csv
+    >>> records = cached_xml_to_json('data/biology_taxonomy.xml')
+    >>> df = cached_read_csv('data/biology_catalogue.csv')
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from config.settings import settings
+
+from .csv_parser import read_csv
+from .xml_parser import xml_to_json
+
+DEFAULT_CACHE_DIR = "data/.cache"
+DEFAULT_MAX_BYTES = 10 * 1024**3
+
+
+class ExtractCache:
+    """Stores parsed extracts as Arrow IPC files keyed by source file fingerprint."""
+
+    def __init__(
+        self, cache_dir: str | None = None, max_bytes: int | None = None
+    ) -> None:
+        """
+        Initialize the cache directory.
+
+        Args:
+            cache_dir: Directory for cache entries. Defaults to settings.extract_cache_dir,
+                then to data/.cache
+            max_bytes: Maximum total size of the cache in bytes. Defaults to
+                settings.extract_cache_max_bytes, then to 10 GiB
+        """
+        self.cache_dir = Path(
+            cache_dir or settings.extract_cache_dir or DEFAULT_CACHE_DIR
+        )
+        self.max_bytes = (
+            max_bytes or settings.extract_cache_max_bytes or DEFAULT_MAX_BYTES
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def content_hash(path: str) -> str:
+        """Returns the BLAKE2b digest of a file's contents."""
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "blake2b").hexdigest()
+
+    def _entry_key(self, kind: str, path: str, params: Dict[str, Any]) -> str:
+        """Cache key for one extractor call (source path plus arguments)."""
+        key = json.dumps(
+            {"kind": kind, "path": str(Path(path).resolve()), "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.cache_dir / f"{key}.arrow", self.cache_dir / f"{key}.json"
+
+    def get(self, kind: str, path: str, params: Dict[str, Any]) -> pa.Table | None:
+        """
+        Returns the cached table for an extractor call, or None on a miss.
+
+        A hit requires the source file's size to match and either its mtime or
+        its content hash to match the fingerprint stored with the entry.
+        """
+        data_path, meta_path = self._paths(self._entry_key(kind, path, params))
+        if not data_path.exists() or not meta_path.exists():
+            return None
+
+        meta = json.loads(meta_path.read_text())
+        stat = os.stat(path)
+        if stat.st_size != meta["size"]:
+            return None
+        if stat.st_mtime_ns != meta["mtime_ns"]:
+            # Touched but possibly unchanged: fall back to the content hash
+            if self.content_hash(path) != meta["content_hash"]:
+                return None
+            meta["mtime_ns"] = stat.st_mtime_ns
+            meta_path.write_text(json.dumps(meta))
+
+        try:
+            table = feather.read_table(data_path, memory_map=True)
+        except (OSError, pa.ArrowInvalid):
+            # Truncated or corrupt entry; treat as a miss and let put() replace it
+            return None
+
+        # Mark as recently used for eviction
+        os.utime(data_path)
+        return table
+
+    def put(
+        self, kind: str, path: str, params: Dict[str, Any], table: pa.Table
+    ) -> None:
+        """Stores the table for an extractor call and evicts old entries if needed."""
+        data_path, meta_path = self._paths(self._entry_key(kind, path, params))
+        stat = os.stat(path)
+        meta = {
+            "kind": kind,
+            "path": str(Path(path).resolve()),
+            "params": json.loads(json.dumps(params, default=str)),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "content_hash": self.content_hash(path),
+        }
+
+        # Write to a temporary file first so a crash never leaves a partial entry
+        tmp_path = data_path.with_suffix(".tmp")
+        feather.write_feather(table, tmp_path, compression="lz4")
+        os.replace(tmp_path, data_path)
+        meta_path.write_text(json.dumps(meta))
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(
+            self.cache_dir.glob("*.arrow"), key=lambda p: p.stat().st_mtime
+        )
+        total = sum(p.stat().st_size for p in entries)
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink()
+            oldest.with_suffix(".json").unlink(missing_ok=True)
+
+
+def _has_nested_nulls(array) -> bool:
+    """Whether any struct field inside a (list of) struct column is null."""
+    if pa.types.is_list(array.type):
+        return _has_nested_nulls(pc.list_flatten(array))
+    if pa.types.is_struct(array.type):
+        return any(
+            field.null_count or _has_nested_nulls(field) for field in array.flatten()
+        )
+    return False
+
+
+def _strip_nulls(value):
+    """Recursively drops None entries from dictionaries (keys that were missing)."""
+    if isinstance(value, dict):
+        return {k: _strip_nulls(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_strip_nulls(v) for v in value]
+    return value
+
+
+def _table_to_records(table: pa.Table) -> List[Dict[str, Any]]:
+    """
+    Converts a table written from parsed records back into those records.
+
+    Arrow stores a key that is missing from a record as null, so nulls are
+    dropped again; the parser never produces None values itself.
+    """
+    names = table.column_names
+    columns = []
+    for column in table.columns:
+        values = column.to_pylist()
+        if _has_nested_nulls(column):
+            values = [_strip_nulls(v) for v in values]
+        columns.append(values)
+
+    if not any(column.null_count for column in table.columns):
+        return [dict(zip(names, row)) for row in zip(*columns)]
+    return [
+        {k: v for k, v in zip(names, row) if v is not None} for row in zip(*columns)
+    ]
+
+
+def cached_xml_to_json(
+    xml_file: str, cache: ExtractCache | None = None, **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Cached version of xml_to_json.
+
+    Args:
+        xml_file: Path to the EMu XML file.
+        cache: ExtractCache to use. Defaults to one built from settings.
+        **kwargs: Passed through to xml_to_json (e.g. workers).
+
+    Returns:
+        The same list of dictionaries as xml_to_json.
+    """
+    cache = cache or ExtractCache()
+    table = cache.get("xml_to_json", xml_file, {})
+    if table is not None:
+        return _table_to_records(table)
+
+    records = xml_to_json(xml_file, **kwargs)
+    if not records:
+        return records
+    try:
+        # Infer the struct type from every record, not just the first one
+        table = pa.Table.from_struct_array(pa.array(records))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Records that Arrow can't type are returned uncached
+        return records
+    cache.put("xml_to_json", xml_file, {}, table)
+    return records
+
+
+def cached_read_csv(
+    file_path: str, cache: ExtractCache | None = None, **kwargs
+) -> pd.DataFrame:
+    """
+    Cached version of read_csv.
+
+    Args:
+        file_path: Path to the CSV file.
+        cache: ExtractCache to use. Defaults to one built from settings.
+        **kwargs: Passed through to read_csv; they are part of the cache key.
+
+    Returns:
+        The same DataFrame as read_csv. If chunksize is given, read_csv's chunk
+        iterator is returned uncached.
+    """
+    if kwargs.get("chunksize"):
+        # Chunk iterators are consumed once; there is nothing to cache
+        return read_csv(file_path, **kwargs)
+
+    cache = cache or ExtractCache()
+    table = cache.get("read_csv", file_path, kwargs)
+    if table is not None:
+        return table.to_pandas()
+
+    df = read_csv(file_path, **kwargs)
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df
+    cache.put("read_csv", file_path, kwargs, table)
+    return df
@@ -5,7 +5,33 @@ To import:
     >>> from emu import emu
 """
 
+import functools
+import itertools
+import warnings
+from typing import Iterator
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+# Bytes read per block by the pyarrow reader
+PYARROW_BLOCK_SIZE = 16 * 1024 * 1024
+
+# dtype override for ISO date columns, understood by both engines
+DATE32 = "date32"
+
+# pandas nullable dtypes for integer columns that turn out to have nulls
+NULLABLE_INTEGERS = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.uint8(): pd.UInt8Dtype(),
+    pa.uint16(): pd.UInt16Dtype(),
+    pa.uint32(): pd.UInt32Dtype(),
+    pa.uint64(): pd.UInt64Dtype(),
+}
 
 
 def read_csv(
@@ -14,9 +40,71 @@ def read_csv(
     compression: str = None,
     columns: list[str] = None,
     dtype: dict = None,
-) -> pd.DataFrame:
-    """Reads a CSV file and returns a DataFrame."""
-    return pd.read_csv(
+    chunksize: int = None,
+    engine: str = "c",
+) -> pd.DataFrame | Iterator[pd.DataFrame]:
+    """
+    Reads a CSV file and returns a DataFrame.
+
+    Args:
+        file_path: Path to the CSV file.
+        delimiter: Field delimiter. Defaults to ",".
+        compression: Compression of the file (e.g. "zip", "gzip"). Defaults to None.
+        columns: Columns to keep. Defaults to all columns.
+        dtype: Column name -> type overrides (e.g. {"irn": "int64"}). Besides
+            pandas dtypes, "category" dictionary-encodes a low-cardinality column
+            and "date32" parses an ISO date column into datetime.date values.
+        chunksize: If given, return an iterator of DataFrames of this many rows
+            instead of reading the whole file at once.
+        engine: "c" for the pandas C parser, or "pyarrow" to decode the file
+            with pyarrow's multithreaded CSV reader. Empty fields in typed
+            numeric and date columns are read as nulls (integer columns with
+            nulls become pandas nullable integers). The pyarrow engine falls
+            back to the C parser, with a warning, for zip archives and for
+            files it cannot convert.
+
+    Returns:
+        A DataFrame, or an iterator of DataFrames if chunksize is given.
+    """
+    read_c = functools.partial(
+        _read_csv_c,
+        file_path,
+        delimiter=delimiter,
+        compression=compression,
+        columns=columns,
+        dtype=dtype,
+        chunksize=chunksize,
+    )
+    if engine != "pyarrow" or compression == "zip":
+        return read_c()
+
+    try:
+        result = _read_csv_pyarrow(
+            file_path,
+            delimiter=delimiter,
+            compression=compression,
+            columns=columns,
+            dtype=dtype,
+            chunksize=chunksize,
+        )
+    except pa.ArrowInvalid as e:
+        _warn_fallback(file_path, e)
+        return read_c()
+    if chunksize:
+        return _chunks_with_fallback(result, read_c, file_path)
+    return result
+
+
+def _read_csv_c(
+    file_path: str,
+    delimiter: str = ",",
+    compression: str = None,
+    columns: list[str] = None,
+    dtype: dict = None,
+    chunksize: int = None,
+) -> pd.DataFrame | Iterator[pd.DataFrame]:
+    """Reads a CSV file with the pandas C parser."""
+    df = pd.read_csv(
         file_path,
         keep_default_na=False,
         on_bad_lines="skip",
@@ -25,5 +113,222 @@ def read_csv(
         compression=compression,
         usecols=columns,
         low_memory=False,
-        dtype=dtype,
+        dtype=_pandas_dtypes(dtype),
+        chunksize=chunksize,
+    )
+    date_columns = [name for name, t in (dtype or {}).items() if _is_date32(t)]
+    if not date_columns:
+        return df
+    if chunksize:
+        return (_parse_dates(chunk, date_columns) for chunk in df)
+    return _parse_dates(df, date_columns)
+
+
+def _chunks_with_fallback(
+    chunks: Iterator[pd.DataFrame], read_c, file_path: str
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields pyarrow chunks, switching to the C parser if a later block fails.
+
+    Both readers yield the same rows in chunks of the same size, so the C
+    parser resumes by skipping the chunks that were already yielded.
+    """
+    yielded = 0
+    try:
+        for chunk in chunks:
+            yield chunk
+            yielded += 1
+    except pa.ArrowInvalid as e:
+        _warn_fallback(file_path, e)
+        yield from itertools.islice(read_c(), yielded, None)
+
+
+def _warn_fallback(file_path: str, error: Exception) -> None:
+    warnings.warn(
+        f"pyarrow could not read {file_path} ({error}); using the slower C parser.",
+        RuntimeWarning,
+        stacklevel=3,
     )
+
+
+def _is_date32(dtype) -> bool:
+    return isinstance(dtype, str) and dtype == DATE32
+
+
+def _pandas_dtypes(dtype: dict | None) -> dict | None:
+    """Dtype overrides for the C parser; date32 columns are read as strings."""
+    if dtype is None:
+        return None
+    return {name: str if _is_date32(t) else t for name, t in dtype.items()}
+
+
+def _parse_dates(df: pd.DataFrame, date_columns: list[str]) -> pd.DataFrame:
+    """Converts ISO date strings to datetime.date, as the pyarrow engine does."""
+    for name in date_columns:
+        if name in df.columns:
+            df[name] = pd.to_datetime(
+                df[name], format="%Y-%m-%d", errors="coerce"
+            ).dt.date
+    return df
+
+
+def _pyarrow_type(dtype) -> pa.DataType:
+    """Maps a pandas-style dtype override (str, int, "Int64", ...) to a pyarrow type."""
+    if isinstance(dtype, pa.DataType):
+        return dtype
+    if dtype in (str, "str", "string", object, "object"):
+        return pa.string()
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if _is_date32(dtype):
+        return pa.date32()
+    pandas_dtype = pd.api.types.pandas_dtype(dtype)
+    # Nullable extension dtypes ("Int64") wrap a numpy dtype
+    return pa.from_numpy_dtype(getattr(pandas_dtype, "numpy_dtype", pandas_dtype))
+
+
+def _is_text(pa_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_string(pa_type)
+        or pa.types.is_large_string(pa_type)
+        or pa.types.is_dictionary(pa_type)
+    )
+
+
+def _cast_columns(table: pa.Table, types: dict) -> pa.Table:
+    """Casts string columns to their pyarrow types, with empty strings as null."""
+    for name, pa_type in types.items():
+        index = table.schema.get_field_index(name)
+        if index == -1:
+            continue
+        column = table.column(index)
+        column = pc.if_else(
+            pc.equal(column, ""), pa.scalar(None, pa.string()), column
+        ).cast(pa_type)
+        table = table.set_column(index, name, column)
+    return table
+
+
+def _to_pandas(table: pa.Table, types: dict) -> pd.DataFrame:
+    """Converts a table to a DataFrame, keeping integer columns with nulls as integers."""
+    table = _cast_columns(table, types)
+    df = table.to_pandas()
+    for name, pa_type in types.items():
+        if name in df.columns and pa_type in NULLABLE_INTEGERS:
+            column = table.column(name)
+            if column.null_count:
+                df[name] = column.to_pandas(types_mapper=NULLABLE_INTEGERS.get)
+    return df
+
+
+def _skip_long_rows(row) -> str:
+    """
+    Skips rows with too many fields, like on_bad_lines="skip" in pandas.
+
+    pandas keeps rows with too few fields (padding them), which pyarrow can't,
+    so those raise and the caller falls back to the C parser.
+    """
+    return "skip" if row.actual_columns > row.expected_columns else "error"
+
+
+def _read_csv_pyarrow(
+    file_path: str,
+    delimiter: str = ",",
+    compression: str = None,
+    columns: list[str] = None,
+    dtype: dict = None,
+    chunksize: int = None,
+) -> pd.DataFrame | Iterator[pd.DataFrame]:
+    """
+    Reads a CSV file with pyarrow, as a whole or as a stream of chunks.
+
+    Options mirror the pandas path: nothing is read as NA, rows with too many
+    fields are skipped and dates are left as strings unless typed as date32. Column types
+    are inferred from the first block unless given in dtype.
+
+    Typed columns other than text are read as strings and cast afterwards, so
+    empty fields (common in EMu exports) become nulls instead of failing the read.
+    """
+    column_types = {name: _pyarrow_type(t) for name, t in (dtype or {}).items()}
+    cast_types = {
+        name: pa_type for name, pa_type in column_types.items() if not _is_text(pa_type)
+    }
+    column_types.update({name: pa.string() for name in cast_types})
+    parse_options = pa_csv.ParseOptions(
+        delimiter=delimiter, invalid_row_handler=_skip_long_rows
+    )
+
+    def convert_options():
+        return pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types=column_types,
+            null_values=[],
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        )
+
+    def open_stream():
+        return pa.input_stream(file_path, compression=compression or "detect")
+
+    # Peek at the first block to find columns pyarrow would parse as dates,
+    # and keep them as strings like parse_dates=False on the pandas path
+    with pa_csv.open_csv(
+        open_stream(),
+        read_options=pa_csv.ReadOptions(block_size=PYARROW_BLOCK_SIZE),
+        parse_options=parse_options,
+        convert_options=convert_options(),
+    ) as reader:
+        schema = reader.schema
+    column_types.update(
+        {
+            field.name: pa.string()
+            for field in schema
+            if field.name not in column_types
+            and (pa.types.is_date(field.type) or pa.types.is_timestamp(field.type))
+        }
+    )
+
+    if chunksize:
+        reader = pa_csv.open_csv(
+            open_stream(),
+            read_options=pa_csv.ReadOptions(block_size=PYARROW_BLOCK_SIZE),
+            parse_options=parse_options,
+            convert_options=convert_options(),
+        )
+        return _iter_batches(reader, chunksize, cast_types)
+
+    table = pa_csv.read_csv(
+        open_stream(),
+        read_options=pa_csv.ReadOptions(
+            use_threads=True, block_size=PYARROW_BLOCK_SIZE
+        ),
+        parse_options=parse_options,
+        convert_options=convert_options(),
+    )
+    return _to_pandas(table, cast_types)
+
+
+def _iter_batches(reader: pa_csv.CSVStreamingReader, chunksize: int, cast_types: dict):
+    """Rebatches a pyarrow CSV stream into DataFrames of chunksize rows."""
+    # Number rows continuously across chunks, as the pandas chunked reader does
+    rows_yielded = 0
+
+    def to_frame(table) -> pd.DataFrame:
+        nonlocal rows_yielded
+        df = _to_pandas(table, cast_types)
+        df.index = pd.RangeIndex(rows_yielded, rows_yielded + len(df))
+        rows_yielded += len(df)
+        return df
+
+    buffered = []
+    buffered_rows = 0
+    for batch in reader:
+        buffered.append(batch)
+        buffered_rows += batch.num_rows
+        while buffered_rows >= chunksize:
+            table = pa.Table.from_batches(buffered)
+            yield to_frame(table.slice(0, chunksize))
+            buffered = table.slice(chunksize).to_batches()
+            buffered_rows -= chunksize
+    if buffered_rows:
+        yield to_frame(pa.Table.from_batches(buffered))
@@ -3,23 +3,45 @@ Parses EMu XML files into Python dictionaries using schema information from XML
 
 This module provides functions to:
 - Extract and parse schema blocks from EMu XML files
+- Compile the parsed schema into an immutable parse plan used on the per-record hot path
 - Recursively parse tuples and tables according to the schema
 - Convert EMu XML files to lists of dictionaries for further processing
+- Stream records one at a time without holding the whole document in memory
+- Parse large exports in parallel, sharded on top-level <tuple> boundaries
+- Build typed Arrow record batches (and Parquet files) directly from the schema
 
 Typical usage:
     >>> from xml_parser import xml_to_json
     >>> records = xml_to_json('path/to/emu.xml')
+
+    >>> from xml_parser import iter_records
+    >>> for record in iter_records('path/to/emu.xml'):
+    ...     process(record)
+
+    >>> from xml_parser import xml_to_arrow
+    >>> table = xml_to_arrow('path/to/emu.xml')
 """
 
+import mmap
+import os
 import re
 import xml.etree.ElementTree as ET
-from typing import Any, Dict, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, NamedTuple, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 
 def extract_schema_from_pi(xml_file: str) -> str:
     """
     Extracts the schema block from an XML file's processing instruction.
 
+    The file is read line by line and reading stops as soon as the schema block
+    closes, so only the head of the export is read.
+
     Args:
         xml_file: Path to the XML file.
 
@@ -29,12 +51,22 @@ def extract_schema_from_pi(xml_file: str) -> str:
     Raises:
         ValueError: If no schema block is found in the XML.
     """
+    schema_lines = []
+    in_schema = False
     with open(xml_file, "r", encoding="utf-8") as f:
-        xml_text = f.read()
-    match = re.search(r"<\?schema(.*?)\?>", xml_text, re.DOTALL)
-    if not match:
-        raise ValueError("No schema block found in XML processing instructions.")
-    return match.group(1)
+        for line in f:
+            if not in_schema:
+                start = line.find("<?schema")
+                if start == -1:
+                    continue
+                in_schema = True
+                line = line[start + len("<?schema") :]
+            end = line.find("?>")
+            if end != -1:
+                schema_lines.append(line[:end])
+                return "".join(schema_lines)
+            schema_lines.append(line)
+    raise ValueError("No schema block found in XML processing instructions.")
 
 
 def parse_schema(schema_text: str) -> Dict[str, Any]:
@@ -78,95 +110,394 @@ def parse_schema(schema_text: str) -> Dict[str, Any]:
     return schema
 
 
+def parse_schema_tree(schema_text: str) -> Dict[str, Any]:
+    """
+    Parses the schema text into a nested dictionary that keeps the table hierarchy.
+
+    parse_schema flattens every table into one namespace; this keeps each nested
+    table or tuple under its parent, which is what a typed (e.g. Arrow) schema needs.
+
+    Args:
+        schema_text: The schema block as a string.
+
+    Returns:
+        A dictionary mapping each top-level table name to its members, where each
+        member is either 'field' for an atom or a nested dictionary for a table/tuple.
+    """
+    tree: Dict[str, Any] = {}
+    stack = [tree]
+    for line in schema_text.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] in ("table", "tuple") and len(parts) >= 2:
+            members: Dict[str, Any] = {}
+            stack[-1][parts[1]] = members
+            stack.append(members)
+        elif parts == ["end"]:
+            stack.pop()
+        elif len(parts) >= 2:
+            stack[-1][parts[-1]] = "field"
+    return tree
+
+
+# Kinds of default value filled in for schema entries missing from a record
+_DEFAULT_ATOM = 0
+_DEFAULT_FIELDS = 1
+_DEFAULT_SINGLE = 2
+
+
+class ParsePlan(NamedTuple):
+    """
+    Precompiled, immutable form of one level of a parsed schema.
+
+    Built once by compile_schema so that parse_tuple only does dict lookups and
+    shallow copies per record instead of walking the schema dictionary.
+
+    Attributes:
+        tables: Plans for nested tables/tuples, keyed by name.
+        single: Field name if this level is a single-field table, else None.
+        fields: Field names if this level is a multi-field table, else None.
+        defaults: (key, kind, fields) entries filled in when a key is missing.
+        keep: Keys retained when pruning a top-level record.
+    """
+
+    tables: Mapping[str, "ParsePlan"]
+    single: str | None
+    fields: Tuple[str, ...] | None
+    defaults: Tuple[Tuple[str, int, Tuple[str, ...]], ...]
+    keep: FrozenSet[str]
+
+
+_EMPTY_PLAN = ParsePlan(MappingProxyType({}), None, None, (), frozenset())
+
+
+def compile_schema(schema: Dict[str, Any]) -> ParsePlan:
+    """
+    Compiles a schema dictionary (or one level of it) into a ParsePlan.
+
+    Args:
+        schema: A dictionary as returned by parse_schema, or one of its nested table entries.
+
+    Returns:
+        An immutable ParsePlan describing how to parse tuples at this level.
+    """
+    if not schema:
+        return _EMPTY_PLAN
+
+    tables = {
+        key: compile_schema(val)
+        for key, val in schema.items()
+        if isinstance(val, dict) and val
+    }
+
+    defaults = []
+    for key, val in schema.items():
+        if val == "field":
+            defaults.append((key, _DEFAULT_ATOM, ()))
+        elif isinstance(val, dict) and "fields" in val:
+            defaults.append((key, _DEFAULT_FIELDS, tuple(val["fields"])))
+        elif isinstance(val, dict) and "single" in val:
+            defaults.append((key, _DEFAULT_SINGLE, ()))
+
+    fields = tuple(schema["fields"]) if "fields" in schema else None
+    return ParsePlan(
+        tables=MappingProxyType(tables),
+        single=schema["single"] if "single" in schema else None,
+        fields=fields,
+        defaults=tuple(defaults),
+        keep=frozenset(fields or ()) | frozenset(schema),
+    )
+
+
 def parse_tuple(elem, schema, is_top_level=False):
     """
     Recursively parses a <tuple> XML element according to the schema.
 
     Args:
         elem: The XML element to parse.
-        schema: The schema dictionary for the current level.
+        schema: The schema dictionary for the current level, or a ParsePlan compiled from it.
         is_top_level: Whether this is the top-level tuple (to avoid including the top-level table name).
 
     Returns:
         A dictionary representing the parsed record, with all expected fields/tables present.
     """
+    plan = schema if isinstance(schema, ParsePlan) else compile_schema(schema)
+    return _parse_tuple(elem, plan, is_top_level)
+
+
+def _parse_tuple(elem, plan: ParsePlan, is_top_level: bool = False) -> Dict[str, Any]:
+    """Parses a <tuple> element using a compiled ParsePlan (see parse_tuple)."""
     data = {}
+    tables = plan.tables
     for child in elem:
-        if child.tag == "atom":
-            value = (child.text or "").strip()
-            data[child.attrib["name"]] = value
+        tag = child.tag
+        if tag == "atom":
+            data[child.attrib["name"]] = (child.text or "").strip()
 
         # <table name="..."> ... <tuple> ... </tuple> ... </table>
-        elif child.tag == "table":
+        elif tag == "table":
             table_name = child.attrib["name"]
-            table_schema = schema.get(table_name)
+            table_plan = tables.get(table_name)
+            if table_plan is None:
+                data[table_name] = [
+                    _parse_tuple(subtuple, _EMPTY_PLAN)
+                    for subtuple in child.findall("tuple")
+                ]
+                continue
+
             nested_rows = [
-                parse_tuple(
-                    subtuple, table_schema if table_schema else {}, is_top_level=False
-                )
+                _parse_tuple(subtuple, table_plan)
                 for subtuple in child.findall("tuple")
             ]
-            if table_schema:
-                if "single" in table_schema:
-                    nested_rows = [
-                        row.get(table_schema["single"], "") for row in nested_rows
-                    ]
-                elif "fields" in table_schema:
-                    for row in nested_rows:
-                        for field in table_schema["fields"]:
-                            row.setdefault(field, "")
+            if table_plan.single is not None:
+                single = table_plan.single
+                nested_rows = [row.get(single, "") for row in nested_rows]
+            elif table_plan.fields is not None:
+                for row in nested_rows:
+                    for field in table_plan.fields:
+                        row.setdefault(field, "")
             data[table_name] = nested_rows
 
         # Handle schema-declared "tuple" blocks that appear directly as a child
         # e.g. <tuple name="AntSiteRef"> ... </tuple>
-        elif child.tag == "tuple":
+        elif tag == "tuple":
             tuple_name = child.attrib.get("name")
             if tuple_name:
-                tuple_schema = schema.get(tuple_name)
-                nested = parse_tuple(
-                    child, tuple_schema if tuple_schema else {}, is_top_level=False
-                )
+                tuple_plan = tables.get(tuple_name)
+                nested = _parse_tuple(child, tuple_plan or _EMPTY_PLAN)
                 # store as list (consistent with <table> handling)
-                if tuple_schema and "single" in tuple_schema:
+                if tuple_plan is not None and tuple_plan.single is not None:
                     # single-field tuple -> list[str]
-                    data[tuple_name] = [nested.get(tuple_schema["single"], "")]
+                    data[tuple_name] = [nested.get(tuple_plan.single, "")]
                 else:
                     # multi-field tuple -> list[dict]
                     # ensure fields present
-                    if tuple_schema and "fields" in tuple_schema:
-                        for field in tuple_schema["fields"]:
+                    if tuple_plan is not None and tuple_plan.fields is not None:
+                        for field in tuple_plan.fields:
                             nested.setdefault(field, "")
                     data[tuple_name] = [nested]
             else:
                 # unnamed tuple: merge its atoms into current level (fallback)
-                nested = parse_tuple(child, {}, is_top_level=False)
-                data.update(nested)
+                data.update(_parse_tuple(child, _EMPTY_PLAN))
 
     # Ensure expected fields/tables are present per schema
-    for key, val in schema.items():
+    for key, kind, fields in plan.defaults:
         if key not in data:
-            if val == "field":
+            if kind == _DEFAULT_ATOM:
                 data[key] = ""
-            elif isinstance(val, dict) and "fields" in val:
-                data[key] = [{field: "" for field in val["fields"]}]
-            elif isinstance(val, dict) and "single" in val:
+            elif kind == _DEFAULT_FIELDS:
+                data[key] = [dict.fromkeys(fields, "")]
+            else:
                 data[key] = []
 
     # If parsing top-level ecatalogue, remove the wrapper keys that are not actual fields
-    if is_top_level and "fields" in schema:
+    if is_top_level and plan.fields is not None:
         for key in list(data.keys()):
-            if key not in schema["fields"] and key not in schema:
+            if key not in plan.keep:
                 del data[key]
 
     return data
 
 
-def xml_to_json(xml_file: str) -> List[Dict[str, Any]]:
+def _record_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the schema entry for the top-level module of an export."""
+    module = "ecatalogue" if schema.get("ecatalogue") else "etaxonomy"
+    return schema[module]
+
+
+def iter_records(xml_file: str, workers: int | None = None) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parses an EMu XML file, yielding one dictionary per record.
+
+    The schema processing instruction is captured during the same pass that
+    parses the records, so the file is only read once. Each top-level <tuple> is
+    parsed as soon as its end tag is read and is then cleared from the tree, so
+    memory use stays flat regardless of export size.
+
+    Args:
+        xml_file: Path to the EMu XML file.
+        workers: If greater than 1, split the file into shards on top-level <tuple>
+            boundaries and parse them in that many processes. Records are still
+            yielded in file order and are identical to the serial path.
+
+    Yields:
+        A dictionary per record, in the same shape as the rows returned by xml_to_json.
+
+    Raises:
+        ValueError: If no schema block is found in the XML.
+    """
+    if workers is not None and workers > 1:
+        return _iter_records_parallel(xml_file, workers)
+    return _iter_records_serial(xml_file)
+
+
+def _iter_records_serial(xml_file: str) -> Iterator[Dict[str, Any]]:
+    """Single-process implementation of iter_records."""
+    record_plan = None
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(xml_file, events=("start", "end", "pi")):
+        if event == "pi":
+            target, _, schema_text = (elem.text or "").partition(" ")
+            if target == "schema" and record_plan is None:
+                record_plan = compile_schema(_record_schema(parse_schema(schema_text)))
+            continue
+
+        if event == "start":
+            depth += 1
+            if root is None:
+                root = elem
+            continue
+
+        depth -= 1
+        # depth 1 is a direct child of the root <table>, i.e. a record
+        if depth == 1 and elem.tag == "tuple":
+            if record_plan is None:
+                raise ValueError(
+                    "No schema block found in XML processing instructions."
+                )
+            yield _parse_tuple(elem, record_plan)
+            # Drop the parsed record (and any preceding siblings) from the tree
+            root.clear()
+
+    if record_plan is None:
+        raise ValueError("No schema block found in XML processing instructions.")
+
+
+# Upper bound on the size of one shard handed to a worker process
+_SHARD_BYTES = 32 * 1024 * 1024
+
+# Opening/closing <table> and <tuple> tags, skipping comments, processing
+# instructions, CDATA and the DOCTYPE declaration (which mention tag names)
+_TAG_PATTERN = re.compile(
+    rb"<!--.*?-->"
+    rb"|<\?.*?\?>"
+    rb"|<!\[CDATA\[.*?\]\]>"
+    rb"|<!DOCTYPE[^\[>]*(?:\[.*?\])?\s*>"
+    rb"|<(/?)(table|tuple)\b[^>]*?(/?)>",
+    re.DOTALL,
+)
+_SELF_CLOSING_PATTERN = re.compile(rb"<(?:table|tuple)\b[^>]*/>")
+
+
+def _depth_change(data: bytes) -> int:
+    """Net change in <table>/<tuple> nesting depth across a run of record markup."""
+    opened = data.count(b"<table") + data.count(b"<tuple")
+    closed = data.count(b"</table") + data.count(b"</tuple")
+    return opened - closed - len(_SELF_CLOSING_PATTERN.findall(data))
+
+
+def iter_shards(xml_file: str, shard_bytes: int) -> Iterator[Tuple[int, int]]:
+    """
+    Splits the body of an EMu XML file into byte ranges of whole top-level <tuple> records.
+
+    Nesting depth up to each split point is counted with bytes.count rather than
+    by visiting every tag, so finding the boundaries costs little compared to
+    parsing. Comments inside the record body are assumed not to contain tags.
+
+    Args:
+        xml_file: Path to the EMu XML file.
+        shard_bytes: Approximate size of a shard in bytes. Each shard is extended
+            to the end of the record that crosses this size.
+
+    Yields:
+        (start, end) byte offsets, in file order, that together cover everything
+        between the root <table> open and close tags.
+    """
+    if os.path.getsize(xml_file) == 0:
+        return
+
+    with (
+        open(xml_file, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        root = next((m for m in _TAG_PATTERN.finditer(mm) if m.group(2)), None)
+        if root is None or root.group(3):
+            return
+        body_end = mm.rfind(b"</table")
+
+        start = pos = root.end()
+        depth = 1  # inside the root <table>
+        while start + shard_bytes < body_end:
+            # Count nesting up to the last tag before the split point
+            split = mm.rfind(b"<", pos, max(start + shard_bytes, pos + 1))
+            if split > pos:
+                depth += _depth_change(mm[pos:split])
+                pos = split
+
+            # Then walk tags until the record open at the split point closes
+            boundary = None
+            for match in _TAG_PATTERN.finditer(mm, pos, body_end):
+                closing, tag, self_closing = match.groups()
+                if tag is None:
+                    continue
+                if not closing:
+                    depth += 1
+                    if not self_closing:
+                        continue
+                depth -= 1
+                # Back at depth 1 after a <tuple> means a whole record has ended
+                if depth == 1 and tag == b"tuple":
+                    boundary = match.end()
+                    break
+
+            if boundary is None:
+                break
+            yield start, boundary
+            start = pos = boundary
+
+        yield start, body_end
+
+
+# Compiled plan for the records of the export being parsed by a worker process
+_worker_plan: ParsePlan | None = None
+
+
+def _init_shard_worker(record_schema: Dict[str, Any]) -> None:
+    """Compiles the shared record schema once per worker process."""
+    global _worker_plan
+    _worker_plan = compile_schema(record_schema)
+
+
+def _parse_shard(xml_file: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Parses the records in one byte range of an EMu XML file (see iter_shards)."""
+    with open(xml_file, "rb") as f:
+        f.seek(start)
+        shard = f.read(end - start)
+    root = ET.fromstring(b"<table>" + shard + b"</table>")
+    return [_parse_tuple(elem, _worker_plan) for elem in root if elem.tag == "tuple"]
+
+
+def _iter_records_parallel(xml_file: str, workers: int) -> Iterator[Dict[str, Any]]:
+    """Multi-process implementation of iter_records."""
+    record_schema = _record_schema(parse_schema(extract_schema_from_pi(xml_file)))
+
+    # Aim for several shards per worker so the pool stays balanced
+    shard_bytes = min(_SHARD_BYTES, max(1, os.path.getsize(xml_file) // (workers * 4)))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_shard_worker,
+        initargs=(record_schema,),
+    ) as executor:
+        # Keep a bounded window of shards in flight and yield them in file order
+        pending = deque()
+        for start, end in iter_shards(xml_file, shard_bytes):
+            pending.append(executor.submit(_parse_shard, xml_file, start, end))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def xml_to_json(xml_file: str, workers: int | None = None) -> List[Dict[str, Any]]:
     """
     Converts an EMu XML file to a list of dictionaries, one per record.
 
     Args:
         xml_file: Path to the EMu XML file.
+        workers: Number of processes to parse with (see iter_records). Defaults to serial.
 
     Returns:
         A list of dictionaries, each representing a record with all expected fields and nested tables.
@@ -175,13 +506,111 @@ def xml_to_json(xml_file: str) -> List[Dict[str, Any]]:
         - Single-field tables are lists of strings.
         - Missing fields/tables are filled with "" or [] as appropriate.
     """
-    schema_text = extract_schema_from_pi(xml_file)
-    schema = parse_schema(schema_text)
-    module = "ecatalogue" if schema.get("ecatalogue") else "etaxonomy"
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    rows = []
-    for tuple_elem in root.findall("tuple"):
-        row = parse_tuple(tuple_elem, schema[module])
-        rows.append(row)
+    return list(iter_records(xml_file, workers=workers))
+
+
+def arrow_schema(schema_text: str) -> pa.Schema:
+    """
+    Builds the Arrow schema for the records of an EMu export.
+
+    Atoms become string columns and nested tables/tuples become list<struct>
+    columns, matching the lists of dictionaries produced by iter_records.
+
+    Args:
+        schema_text: The schema block as a string.
+
+    Returns:
+        A pyarrow.Schema with one field per top-level atom or table.
+    """
+    tree = parse_schema_tree(schema_text)
+    module = "ecatalogue" if tree.get("ecatalogue") else "etaxonomy"
+    return pa.schema(_arrow_fields(tree[module]))
+
+
+def _arrow_fields(members: Dict[str, Any]) -> List[pa.Field]:
+    """Converts one level of a schema tree to Arrow fields."""
+    return [
+        pa.field(name, pa.string())
+        if member == "field"
+        else pa.field(name, pa.list_(pa.struct(_arrow_fields(member))))
+        for name, member in members.items()
+    ]
+
+
+def iter_record_batches(
+    xml_file: str, batch_size: int = 50_000, workers: int | None = None
+) -> Iterator[pa.RecordBatch]:
+    """
+    Parses an EMu XML file into Arrow record batches typed from its schema.
+
+    Records are converted batch by batch as they are parsed, so at most one
+    batch of Python dictionaries is held at a time. Keys that are missing from a
+    record become nulls; keys that are not declared in the schema are dropped.
+
+    Args:
+        xml_file: Path to the EMu XML file.
+        batch_size: Number of records per batch. Defaults to 50,000.
+        workers: Number of processes to parse with (see iter_records). Defaults to serial.
+
+    Yields:
+        pyarrow.RecordBatch objects sharing the schema returned by arrow_schema.
+    """
+    schema = arrow_schema(extract_schema_from_pi(xml_file))
+    batch = []
+    for record in iter_records(xml_file, workers=workers):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield pa.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+
+def xml_to_arrow(
+    xml_file: str, batch_size: int = 50_000, workers: int | None = None
+) -> pa.Table:
+    """
+    Converts an EMu XML file to a pyarrow Table (see iter_record_batches).
+
+    Args:
+        xml_file: Path to the EMu XML file.
+        batch_size: Number of records converted at a time. Defaults to 50,000.
+        workers: Number of processes to parse with (see iter_records). Defaults to serial.
+
+    Returns:
+        A pyarrow.Table with string columns for atoms and list<struct> columns for nested tables.
+    """
+    schema = arrow_schema(extract_schema_from_pi(xml_file))
+    return pa.Table.from_batches(
+        iter_record_batches(xml_file, batch_size=batch_size, workers=workers),
+        schema=schema,
+    )
+
+
+def xml_to_parquet(
+    xml_file: str,
+    parquet_path: str,
+    batch_size: int = 50_000,
+    workers: int | None = None,
+) -> int:
+    """
+    Streams an EMu XML file into a Parquet file without building the whole table in memory.
+
+    Args:
+        xml_file: Path to the EMu XML file.
+        parquet_path: Path of the Parquet file to write.
+        batch_size: Number of records converted and written at a time. Defaults to 50,000.
+        workers: Number of processes to parse with (see iter_records). Defaults to serial.
+
+    Returns:
+        The number of records written.
+    """
+    schema = arrow_schema(extract_schema_from_pi(xml_file))
+    rows = 0
+    with pq.ParquetWriter(parquet_path, schema) as writer:
+        for batch in iter_record_batches(
+            xml_file, batch_size=batch_size, workers=workers
+        ):
+            writer.write_batch(batch)
+            rows += batch.num_rows
     return rows
@@ -0,0 +1,119 @@
+"""
+Per-table manifest of row content hashes, used to skip unchanged rows.
+
+After a successful load, the manifest records a 64-bit hash of every row
+that was loaded, keyed by primary key. On the next load only rows whose key
+is new or whose hash differs are sent. Manifests are Parquet files under
+settings.load_manifest_dir, one per table and Supabase project.
+
+The manifest only knows what this machine loaded. If the table is edited or
+truncated elsewhere, load once without delta to bring it back in line.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+
+DEFAULT_MANIFEST_DIR = "data/.manifests"
+
+# infer_dtype results of object columns that may hold lists or dicts; any
+# other object column (strings, numbers, nulls) is hashed as it is
+NESTED_INFERRED_TYPES = {"mixed", "mixed-integer"}
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Returns a stable 64-bit content hash for every row of df.
+
+    Columns are hashed in name order, so reordering columns doesn't change
+    the hashes. Lists and dicts (array and JSON columns) are hashed through
+    their JSON encoding; each column is checked once, and only columns that
+    may hold them are encoded value by value.
+    """
+    columns = sorted(df.columns)
+    hashable = pd.DataFrame(index=df.index)
+    for column in columns:
+        values = df[column]
+        if (
+            values.dtype == object
+            and pd.api.types.infer_dtype(values, skipna=True) in NESTED_INFERRED_TYPES
+        ):
+            values = values.map(
+                lambda v: (
+                    json.dumps(v, sort_keys=True, default=str)
+                    if isinstance(v, (list, dict))
+                    else v
+                )
+            )
+        hashable[column] = values
+    # Mix the column names in, so adding or renaming a column changes every hash
+    names = hashlib.blake2b(json.dumps(columns).encode(), digest_size=8)
+    hashes = pd.util.hash_pandas_object(
+        hashable, index=False, hash_key=names.hexdigest()[:16]
+    )
+    return hashes
+
+
+class HashManifest:
+    """Stores the content hash of every loaded row of one table."""
+
+    def __init__(
+        self, table_name: str, project_url: str, manifest_dir: str | None = None
+    ) -> None:
+        """
+        Initialize the manifest for a table.
+
+        Args:
+            table_name: Name of the Supabase table.
+            project_url: Supabase project URL; manifests are kept per project.
+            manifest_dir: Directory for manifest files. Defaults to
+                settings.load_manifest_dir, then to data/.manifests
+        """
+        manifest_dir = Path(
+            manifest_dir or settings.load_manifest_dir or DEFAULT_MANIFEST_DIR
+        )
+        manifest_dir.mkdir(parents=True, exist_ok=True)
+        project = hashlib.blake2b(project_url.encode(), digest_size=4).hexdigest()
+        self.path = manifest_dir / f"{table_name}-{project}.parquet"
+
+    def load(self) -> pd.Series:
+        """Returns the stored hashes indexed by primary key (as strings)."""
+        if not self.path.exists():
+            return pd.Series(dtype="uint64", index=pd.Index([], dtype=str))
+        return pd.read_parquet(self.path)["hash"]
+
+    def changed(self, keys: pd.Series, hashes: pd.Series) -> pd.Series:
+        """
+        Returns a boolean mask of rows that are new or changed since the last load.
+
+        Args:
+            keys: Primary key of every row.
+            hashes: Content hash of every row, aligned with keys.
+        """
+        stored = self.load()
+        positions = stored.index.get_indexer(keys.astype(str).to_numpy())
+        previous = stored.to_numpy()[positions.clip(min=0)] if len(stored) else 0
+        return pd.Series(
+            (positions < 0) | (previous != hashes.to_numpy()),
+            index=hashes.index,
+        )
+
+    def update(self, keys: pd.Series, hashes: pd.Series) -> None:
+        """Records the hashes of rows that were loaded successfully."""
+        loaded = pd.Series(
+            hashes.to_numpy(), index=pd.Index(keys.astype(str).to_numpy(), name="key")
+        )
+        loaded = loaded[~loaded.index.duplicated(keep="last")]
+        stored = self.load()
+        replaced = stored.index.get_indexer(loaded.index)
+        keep = np.ones(len(stored), dtype=bool)
+        keep[replaced[replaced >= 0]] = False
+        merged = pd.concat([stored[keep], loaded])
+        tmp_path = self.path.with_suffix(".tmp")
+        merged.rename("hash").to_frame().to_parquet(tmp_path)
+        tmp_path.replace(self.path)
@@ -1,17 +1,231 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import csv
+import importlib.util
 import json
+import statistics
+import threading
+import time
+
+import httpx
+import orjson
 import pandas as pd
+from postgrest.exceptions import (
+    APIError,
+    APIErrorFromJSON,
+    generate_default_error_message,
+)
+from postgrest.types import CountMethod
+from pydantic import ValidationError
 
 from config.settings import settings
-from supabase import create_client
+from supabase import ClientOptions, create_client
+
+from .manifest import HashManifest, row_hashes
+from .postgres_copy import PostgresCopy
+
+# Rows per page when reading join tables. Must not exceed PostgREST's max-rows
+# (1000 on Supabase by default), or pages would look complete when they aren't
+JOIN_PAGE_SIZE = 1000
+
+# PostgREST error code for a function that doesn't exist (or isn't exposed)
+MISSING_FUNCTION = "PGRST202"
+
+# HTTP clients shared by every SupabaseLoader in the process, by settings
+_HTTP_CLIENTS: Dict[tuple, httpx.Client] = {}
+_HTTP_CLIENTS_LOCK = threading.Lock()
+
+# Columns every insert returns, to tell inserted rows from updated ones
+COUNT_COLUMNS = ["created_at", "updated_at"]
+
+# Upper bound on the JSON payload of one insert request
+DEFAULT_CHUNK_BYTES = 2 * 1024 * 1024
+
+# Responses that mean the chunk was too big (or too slow) to write in one go;
+# the chunk is split in half and each half is sent on its own (504 only for
+# upserts, see _is_ambiguous)
+SPLIT_STATUSES = {413, 504}
+# PostgreSQL statement_timeout error code, as reported by PostgREST
+STATEMENT_TIMEOUT = "57014"
+
+# Responses worth retrying as they are: rate limits and server hiccups
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 520}
+
+# Transport errors raised before the request reaches the server
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _error_status(e: APIError) -> Optional[int]:
+    """HTTP status of an APIError raised for a non-JSON response, if any."""
+    code = str(e.code)
+    return int(code) if code.isdigit() and len(code) == 3 else None
+
+
+def _is_ambiguous(e: Exception) -> bool:
+    """
+    Whether the chunk may have been written even though the request failed:
+    the request was sent but the response was lost or timed out at a proxy.
+    """
+    if isinstance(e, UNSENT_ERRORS):
+        return False
+    if isinstance(e, httpx.TransportError):
+        return True
+    return isinstance(e, APIError) and _error_status(e) == 504
+
+
+def _should_split(e: Exception, idempotent: bool) -> bool:
+    """
+    Whether a failed chunk should be bisected and sent in halves. Ambiguous
+    failures are only split when resending can't duplicate rows (upserts).
+    """
+    if _is_ambiguous(e) and not idempotent:
+        return False
+    if isinstance(e, httpx.TimeoutException):
+        return not isinstance(e, UNSENT_ERRORS)
+    if isinstance(e, APIError):
+        return _error_status(e) in SPLIT_STATUSES or e.code == STATEMENT_TIMEOUT
+    return False
+
+
+def _should_retry(e: Exception, idempotent: bool) -> bool:
+    """
+    Whether a failed chunk may succeed if sent again unchanged. Ambiguous
+    failures are only retried when resending can't duplicate rows (upserts).
+    """
+    if _is_ambiguous(e):
+        return idempotent
+    if isinstance(e, httpx.TransportError):
+        return True
+    if isinstance(e, APIError):
+        return _error_status(e) in TRANSIENT_STATUSES
+    return False
+
+
+def _chunk_ranges(
+    sizes: List[int], max_rows: int, max_bytes: int
+) -> List[tuple[int, int]]:
+    """
+    Splits rows into (start, end) ranges of at most max_rows rows and max_bytes
+    serialized bytes. A single row larger than max_bytes gets a chunk of its own.
+    """
+    ranges = []
+    start = 0
+    chunk_bytes = 0
+    for i, size in enumerate(sizes):
+        if i > start and (i - start >= max_rows or chunk_bytes + size > max_bytes):
+            ranges.append((start, i))
+            start = i
+            chunk_bytes = 0
+        chunk_bytes += size
+    if start < len(sizes):
+        ranges.append((start, len(sizes)))
+    return ranges
+
+
+def _json_default(value: Any) -> Any:
+    """Encodes values orjson doesn't handle natively: nulls as null, the rest as strings."""
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return str(value)
+
+
+def _encode_row(row: Dict[Any, Any]) -> bytes:
+    """
+    Serializes one row to JSON bytes.
+
+    NaN, pd.NA and NaT are written as null at any depth, so nested lists and
+    dictionaries don't need cleaning beforehand.
+    """
+    return orjson.dumps(
+        row,
+        default=_json_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def _api_error(response: httpx.Response) -> APIError:
+    """Builds the APIError postgrest would raise for a failed response."""
+    try:
+        return APIError(dict(APIErrorFromJSON.model_validate_json(response.content)))
+    except ValidationError:
+        return APIError(generate_default_error_message(response))
+
+
+class _CsvSpill:
+    """Appends selected columns of returned records to a CSV file."""
+
+    def __init__(self, path: str, columns: List[str]) -> None:
+        self.path = path
+        self.columns = columns
+        # Start a fresh file with just the header
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerow(columns)
+
+    def write(self, records: list) -> None:
+        with open(self.path, "a", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerows(
+                [record.get(column) for column in self.columns] for record in records
+            )
+
+
+def shared_http_client(
+    timeout: float = 600,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 60,
+) -> httpx.Client:
+    """
+    Returns the process-wide httpx.Client for these settings, creating it on first use.
+
+    Connections are kept alive between requests and between loaders, and use
+    HTTP/2 when the h2 package is installed.
+
+    Args:
+        timeout: Request timeout in seconds
+        max_connections: Maximum number of open connections
+        max_keepalive_connections: Idle connections kept open for reuse
+        keepalive_expiry: Seconds an idle connection is kept open
+    """
+    key = (timeout, max_connections, max_keepalive_connections, keepalive_expiry)
+    with _HTTP_CLIENTS_LOCK:
+        if key not in _HTTP_CLIENTS:
+            _HTTP_CLIENTS[key] = httpx.Client(
+                http2=importlib.util.find_spec("h2") is not None,
+                timeout=httpx.Timeout(timeout),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                follow_redirects=True,
+            )
+        return _HTTP_CLIENTS[key]
+
+
+class _LoadStats:
+    """Chunks sent, retries and splits during one insert_rows call."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.chunks: List[tuple[int, int]] = []  # (rows, bytes) of each request
+        self.retries = 0
+        self.splits = 0
 
 
 class SupabaseLoader:
     """Handles loading data into Supabase tables."""
 
     def __init__(
-        self, url: Optional[str] = None, key: Optional[str] = None, timeout: int = 600
+        self,
+        url: Optional[str] = None,
+        key: Optional[str] = None,
+        timeout: int = 600,
+        max_retries: int = 5,
+        retry_backoff: float = 1.0,
+        db_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
     ) -> None:
         """
         Initialize Supabase client.
@@ -20,19 +234,45 @@ class SupabaseLoader:
             url: Supabase project URL. Defaults to settings.supabase_url
             key: Supabase service role key. Defaults to settings.supabase_key
             timeout: Request timeout in seconds. Defaults to 600 (10 minutes)
+            max_retries: Times a chunk is resent after a transient failure
+                (connection error, 429 or 5xx). Timeouts and 504s are only
+                retried for upserts. Defaults to 5
+            retry_backoff: Seconds to wait before the first retry; doubles on
+                each further retry. Defaults to 1
+            db_url: Postgres connection string for backend="copy" loads.
+                Defaults to settings.supabase_db_url
+            http_client: httpx.Client to send requests with. Defaults to the
+                process-wide client from shared_http_client(timeout), so every
+                loader in a script reuses the same warm connections
         """
         self.url = url or settings.supabase_url
         self.key = key or settings.supabase_key
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.db_url = db_url
 
         if not self.url or not self.key:
             raise ValueError(
                 "Supabase credentials missing. Set SUPABASE_URL and SUPABASE_KEY in .env"
             )
 
-        self.client = create_client(self.url, self.key)
+        self.http_client = http_client or shared_http_client(timeout)
+        self.client = create_client(
+            self.url,
+            self.key,
+            options=ClientOptions(
+                httpx_client=self.http_client, postgrest_client_timeout=timeout
+            ),
+        )
+        # supabase builds the PostgREST client lazily on first access. Build it
+        # here, so threads sending chunks concurrently all share one instance
+        self.postgrest = self.client.postgrest
 
     def _validate_primary_key(
-        self, rows: List[Dict[Any, Any]], primary_key: Optional[str] = None
+        self,
+        rows: List[Dict[Any, Any]],
+        primary_key: Optional[str] = None,
+        offset: int = 0,
     ) -> None:
         """
         Validate that each record has the specified primary key field if one is required.
@@ -40,6 +280,7 @@ class SupabaseLoader:
         Args:
             rows: List of records to validate
             primary_key: Name of the primary key field to validate. If None, no validation is performed.
+            offset: Index of the first record, when validating a slice of a larger load
 
         Raises:
             ValueError: If any record is missing the primary key or has an empty/null value
@@ -50,7 +291,7 @@ class SupabaseLoader:
         for i, row in enumerate(rows):
             if primary_key not in row or not row[primary_key]:
                 raise ValueError(
-                    f"Record at index {i} is missing required '{primary_key}' field: {row}"
+                    f"Record at index {i + offset} is missing required '{primary_key}' field: {row}"
                 )
 
     def _replace_nan_with_none(self, value):
@@ -67,6 +308,23 @@ class SupabaseLoader:
             return {k: self._replace_nan_with_none(v) for k, v in value.items()}
         return value  # Return the value as-is if it's not NaN, a list, or a dictionary
 
+    def _dataframe_to_rows(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convert a DataFrame to row dictionaries with every null (NaN, NaT, pd.NA) as None.
+
+        Nulls are replaced column by column. Nulls nested inside list or dictionary
+        values are left in place; _encode_row writes them as null.
+        """
+        columns = []
+        for name in df.columns:
+            series = df[name]
+            values = series.to_numpy(dtype=object, copy=True)
+            values[series.isna().to_numpy()] = None
+            columns.append(values)
+
+        names = list(df.columns)
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
     def _count_updates(self, responses: List[Dict[str, Any]]) -> dict:
         """
         Count number of inserted and updated records based on created_at and updated_at fields.
@@ -75,16 +333,107 @@ class SupabaseLoader:
         Returns:
             Dictionary with counts of 'inserted' and 'updated' records
         """
-        operations = {"inserted": 0, "updated": 0}
-        for record in responses:
-            created = datetime.fromisoformat(record["created_at"])
-            updated = datetime.fromisoformat(record["updated_at"])
-
-            if created == updated:
-                operations["inserted"] += 1
-            else:
-                operations["updated"] += 1
-        return operations
+        # Both columns are timestamptz, so equal instants come back as equal
+        # strings and there is no need to parse them
+        inserted = sum(
+            1 for record in responses if record["created_at"] == record["updated_at"]
+        )
+        return {"inserted": inserted, "updated": len(responses) - inserted}
+
+    def _insert_chunk(
+        self,
+        table_name: str,
+        rows: List[Dict[Any, Any]],
+        encoded: List[bytes],
+        start: int,
+        end: int,
+        offset: int,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+        stats: _LoadStats,
+    ) -> list:
+        """
+        Insert or upsert rows[start:end] and return the affected records.
+
+        Transient failures are retried with exponential backoff. A chunk that is
+        too large or times out is split in half and each half is sent on its own.
+        Failures after which the chunk may already be written (read timeouts,
+        504s, dropped connections) are only retried or split for upserts, as
+        resending a plain insert could duplicate its rows.
+
+        Args:
+            table_name: Name of the table to insert into
+            rows: Rows of the window being loaded, used for error context
+            encoded: JSON encoding of each row in the window
+            start: Index of the chunk's first row in the window
+            end: Index after the chunk's last row in the window
+            offset: Index of the window's first row in the whole load, so
+                errors report where the chunk starts in the load
+            params: PostgREST query parameters (columns, on_conflict)
+            headers: PostgREST request headers (auth, Prefer)
+            stats: Collects the chunks sent, retries and splits
+        """
+        payload = b"[" + b",".join(encoded[start:end]) + b"]"
+        url = str(self.postgrest.base_url.joinpath(table_name))
+        idempotent = "on_conflict" in params
+        attempt = 0
+        while True:
+            try:
+                response = self.postgrest.session.post(
+                    url, content=payload, params=params, headers=headers
+                )
+                if not response.is_success:
+                    raise _api_error(response)
+                break
+            except Exception as e:
+                if end - start > 1 and _should_split(e, idempotent):
+                    with stats.lock:
+                        stats.splits += 1
+                    middle = (start + end) // 2
+                    return self._insert_chunk(
+                        table_name,
+                        rows,
+                        encoded,
+                        start,
+                        middle,
+                        offset,
+                        params,
+                        headers,
+                        stats,
+                    ) + self._insert_chunk(
+                        table_name,
+                        rows,
+                        encoded,
+                        middle,
+                        end,
+                        offset,
+                        params,
+                        headers,
+                        stats,
+                    )
+                if _should_retry(e, idempotent) and attempt < self.max_retries:
+                    with stats.lock:
+                        stats.retries += 1
+                    time.sleep(self.retry_backoff * 2**attempt)
+                    attempt += 1
+                    continue
+
+                # Print helpful context before re-raising so you can see failing payload
+                print(
+                    f"\nSupabase API error when inserting to '{table_name}' (upsert={'on_conflict' in params}, primary_key={params.get('on_conflict')})"
+                )
+                print(
+                    f"Chunk index start={offset + start} size={end - start}. Sample payload:"
+                )
+                try:
+                    print(json.dumps(rows[start : start + 3], default=str, indent=2))
+                except Exception:
+                    print(rows[start : start + 3])
+                raise e
+
+        with stats.lock:
+            stats.chunks.append((end - start, len(payload)))
+        return orjson.loads(response.content)
 
     def insert_rows(
         self,
@@ -93,6 +442,9 @@ class SupabaseLoader:
         primary_key: Optional[str] = None,
         upsert: bool = False,
         chunk_size: int = 1000,
+        max_in_flight: int = 1,
+        max_chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        return_rows: bool = True,
     ) -> list:
         """
         Insert rows into a Supabase table.
@@ -104,7 +456,15 @@ class SupabaseLoader:
                        If None, no primary key validation is performed.
                        For backwards compatibility, defaults to 'irn' if upsert is True.
             upsert: If True, performs an upsert operation. Defaults to False
-            chunk_size: Number of rows to insert in each batch. Defaults to 1000
+            chunk_size: Maximum number of rows in each batch. Defaults to 1000
+            max_in_flight: Number of chunks sent concurrently. Defaults to 1
+                (one request at a time). Results keep the order of the rows.
+            max_chunk_bytes: Maximum serialized JSON size of each batch. Defaults
+                to 2 MiB. Batches that are still rejected as too large, or time
+                out during an upsert, are split in half and resent.
+            return_rows: If True, Supabase sends back every inserted/updated
+                record. If False, only created_at and updated_at are returned
+                (enough for the counts) and results is empty
 
         Returns:
             Dictionary with 'results' (list of inserted/updated records) and
@@ -127,38 +487,122 @@ class SupabaseLoader:
             for row in rows
         ]
 
+        window_rows = chunk_size * (max_in_flight + 1)
         results = []
-        for i in range(0, len(rows), chunk_size):
-            chunk = rows[i : i + chunk_size]
-            query = self.client.table(table_name).insert(chunk)
-            if upsert and primary_key:
-                # Use specified primary key as conflict detection column
-                query = self.client.table(table_name).upsert(
-                    on_conflict=primary_key, json=chunk
-                )
-            try:
-                response = query.execute()
-            except Exception as e:
-                # Print helpful context before re-raising so you can see failing payload
-                print(
-                    f"\nSupabase API error when inserting to '{table_name}' (upsert={upsert}, primary_key={primary_key})"
-                )
-                print(f"Chunk index start={i} size={len(chunk)}. Sample payload:")
-                try:
-                    print(json.dumps(chunk[:3], default=str, indent=2))
-                except Exception:
-                    print(chunk[:3])
-                raise e
-            results.extend(response.data)
+        operations = self._send_windows(
+            table_name,
+            (rows[i : i + window_rows] for i in range(0, len(rows), window_rows)),
+            columns=list(dict.fromkeys(key for row in rows for key in row)),
+            primary_key=primary_key,
+            upsert=upsert,
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            max_chunk_bytes=max_chunk_bytes,
+            on_response=results.extend if return_rows else None,
+            returning=None if return_rows else [],
+        )
+        return [results, operations]
+
+    def _send_windows(
+        self,
+        table_name: str,
+        windows: Iterator[List[Dict[Any, Any]]],
+        columns: List[str],
+        primary_key: Optional[str],
+        upsert: bool,
+        chunk_size: int,
+        max_in_flight: int,
+        max_chunk_bytes: int,
+        on_response: Optional[Callable[[list], None]] = None,
+        returning: Optional[List[str]] = None,
+    ) -> dict:
+        """
+        Serialize cleaned rows one window at a time and send them in chunks.
 
-        operations = self._count_updates(results)
-        # Optionally log or handle operations here if needed
+        Each row is encoded to JSON bytes a single time; the bytes are used both
+        to size the chunks and as the request bodies. Only the windows with chunks
+        in flight are held in memory, and responses are reduced to counts as they
+        arrive unless on_response keeps them.
 
-        self.print_load_summary(
-            table_name, {"operations": operations, "results": results}
-        )
+        Args:
+            windows: Consecutive slices of the rows to load
+            columns: Every column name present in the rows
+            on_response: Called with the returned records of each chunk, in order
+            returning: Columns returned for each row. created_at and updated_at
+                are always added, as the counts are based on them. None returns
+                full rows
 
-        return [results, operations]
+        Returns:
+            Counts of 'inserted' and 'updated' records
+        """
+        # Same request postgrest builds for insert()/upsert(on_conflict=...)
+        params = {"columns": ",".join(f'"{key}"' for key in columns)}
+        if returning is not None:
+            params["select"] = ",".join(dict.fromkeys([*returning, *COUNT_COLUMNS]))
+        # The HTTP client may be shared, so it has no base URL or auth headers
+        headers = {**self.postgrest.headers, "Prefer": "return=representation"}
+        if upsert and primary_key:
+            # Use specified primary key as conflict detection column
+            params["on_conflict"] = primary_key
+            headers["Prefer"] += ",resolution=merge-duplicates"
+        headers["Content-Type"] = "application/json"
+
+        def chunks():
+            """Yields the arguments of _insert_chunk for every chunk, lazily."""
+            offset = 0
+            for rows in windows:
+                encoded = [_encode_row(row) for row in rows]
+                sizes = [len(row) + 1 for row in encoded]
+                for start, end in _chunk_ranges(sizes, chunk_size, max_chunk_bytes):
+                    yield (
+                        table_name,
+                        rows,
+                        encoded,
+                        start,
+                        end,
+                        offset,
+                        params,
+                        headers,
+                    )
+                offset += len(rows)
+
+        operations = {"inserted": 0, "updated": 0}
+
+        def collect(records: list) -> None:
+            for key, count in self._count_updates(records).items():
+                operations[key] += count
+            if on_response:
+                on_response(records)
+
+        stats = _LoadStats()
+        started = time.perf_counter()
+        if max_in_flight <= 1:
+            for args in chunks():
+                collect(self._insert_chunk(*args, stats))
+        else:
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                # Keep a bounded number of chunks queued so windows are only
+                # encoded shortly before they are sent
+                pending = deque()
+                try:
+                    for args in chunks():
+                        if len(pending) >= 2 * max_in_flight:
+                            collect(pending.popleft().result())
+                        pending.append(
+                            executor.submit(self._insert_chunk, *args, stats)
+                        )
+                    while pending:
+                        collect(pending.popleft().result())
+                except Exception:
+                    # Don't send the chunks that haven't started yet
+                    for future in pending:
+                        future.cancel()
+                    raise
+        elapsed = time.perf_counter() - started
+
+        self.print_load_summary(table_name, {"operations": operations})
+        self.print_throughput(stats, elapsed)
+        return operations
 
     def load_dataframe(
         self,
@@ -167,10 +611,20 @@ class SupabaseLoader:
         primary_key: Optional[str] = None,
         upsert: bool = False,
         chunk_size: int = 1000,
+        max_in_flight: int = 1,
+        max_chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        delta: bool = False,
+        return_rows: bool = False,
+        spill_path: Optional[str] = None,
+        spill_columns: Optional[List[str]] = None,
+        backend: str = "rest",
     ) -> list:
         """
         Load a pandas DataFrame into a Supabase table.
 
+        The frame is converted and sent a few chunks at a time, so memory use
+        grows with chunk_size and max_in_flight rather than with the table.
+
         Args:
             table_name: Name of the table to insert into
             df: pandas DataFrame to load
@@ -179,14 +633,37 @@ class SupabaseLoader:
                        For backwards compatibility, defaults to 'irn' if upsert is True.
             upsert: If True, performs an upsert operation. Defaults to False
             chunk_size: Number of rows to insert in each batch. Defaults to 1000
+            max_in_flight: Number of chunks sent concurrently. Defaults to 1
+            max_chunk_bytes: Maximum serialized JSON size of each batch. Defaults to 2 MiB
+            delta: If True, only send rows that are new or changed since the last
+                delta load of this table, according to a local manifest of row
+                content hashes (see etl.loaders.manifest). Requires a primary key.
+            return_rows: If True, Supabase sends back full records and they are
+                returned. Defaults to False: only created_at and updated_at
+                (plus any spill_columns) are requested, and only counts are kept
+            spill_path: If given, append the returned records' spill_columns to
+                this CSV file as each chunk completes (e.g. to map keys to ids)
+            spill_columns: Columns of the returned records to spill. Defaults to
+                the primary key
+            backend: "rest" sends chunks through PostgREST. "copy" streams the
+                whole frame with COPY over a direct database connection and
+                merges it in one transaction (see etl.loaders.postgres_copy);
+                much faster for initial loads and full rebuilds, but returns
+                no records, so return_rows and spill_path aren't supported
 
         Returns:
-            Dictionary with 'results' (list of inserted/updated records) and
-            'operations' (counts of inserted and updated records)
+            Dictionary with 'results' (list of inserted/updated records, empty
+            unless return_rows) and 'operations' (counts of inserted and updated
+            records, plus 'unchanged' rows skipped in delta mode)
 
         Raises:
             ValueError: If DataFrame is missing the required primary key column
         """
+        if backend not in ("rest", "copy"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'rest' or 'copy'")
+        if backend == "copy" and (return_rows or spill_path):
+            raise ValueError("return_rows and spill_path need the 'rest' backend")
+
         # For backwards compatibility, use 'irn' as primary key if upsert is True and no key specified
         if upsert and primary_key is None:
             primary_key = "irn"
@@ -203,13 +680,93 @@ class SupabaseLoader:
                     f"Found {null_keys:,} rows with null/empty {primary_key} values"
                 )
 
-        rows = df.to_dict("records")
-        return self.insert_rows(
+        if delta:
+            if not primary_key:
+                raise ValueError("Delta loads need a primary_key to match rows")
+            manifest = HashManifest(table_name, self.url)
+            hashes = row_hashes(df)
+            changed = manifest.changed(df[primary_key], hashes).to_numpy()
+            unchanged = int((~changed).sum())
+            df = df[changed]
+            hashes = hashes[changed]
+
+        results = []
+        if backend == "copy":
+            print(f"\nCopying {len(df):,} records into {table_name}...")
+            operations = PostgresCopy(self.db_url).load_dataframe(
+                table_name, df, primary_key=primary_key, upsert=upsert
+            )
+            self.print_load_summary(table_name, {"operations": operations})
+        else:
+            operations = self._send_dataframe(
+                table_name,
+                df,
+                primary_key=primary_key,
+                upsert=upsert,
+                chunk_size=chunk_size,
+                max_in_flight=max_in_flight,
+                max_chunk_bytes=max_chunk_bytes,
+                results=results if return_rows else None,
+                spill_path=spill_path,
+                spill_columns=spill_columns,
+            )
+
+        if delta:
+            # Only record hashes once the rows are safely in the table
+            manifest.update(df[primary_key], hashes)
+            operations["unchanged"] = unchanged
+            print(f" Unchanged: {unchanged:,}")
+        return [results, operations]
+
+    def _send_dataframe(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        primary_key: Optional[str],
+        upsert: bool,
+        chunk_size: int,
+        max_in_flight: int,
+        max_chunk_bytes: int,
+        results: Optional[list],
+        spill_path: Optional[str],
+        spill_columns: Optional[List[str]],
+    ) -> Dict[str, int]:
+        """Sends a DataFrame through PostgREST a window of chunks at a time."""
+        window_rows = chunk_size * (max_in_flight + 1)
+
+        def windows():
+            for i in range(0, len(df), window_rows):
+                rows = self._dataframe_to_rows(df.iloc[i : i + window_rows])
+                self._validate_primary_key(rows, primary_key, offset=i)
+                yield rows
+
+        # Only ask for the columns something is going to use
+        responses = []
+        returning = []
+        if spill_path:
+            spill_columns = spill_columns or [primary_key]
+            spill = _CsvSpill(spill_path, spill_columns)
+            responses.append(spill.write)
+            returning = spill_columns
+        if results is not None:
+            responses.append(results.extend)
+            returning = None
+
+        def on_response(records: list) -> None:
+            for handle in responses:
+                handle(records)
+
+        return self._send_windows(
             table_name,
-            rows,
+            windows(),
+            columns=list(df.columns),
             primary_key=primary_key,
             upsert=upsert,
             chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            max_chunk_bytes=max_chunk_bytes,
+            on_response=on_response if responses else None,
+            returning=returning,
         )
 
     def sync_join_table(
@@ -220,7 +777,9 @@ class SupabaseLoader:
         target_key: str,
         chunk_size: int = 100,
         keys_unique: bool = True,
-    ) -> None:
+        bulk_delete: bool = True,
+        max_chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    ) -> Dict[str, int]:
         """
         Synchronize a join table based on a DataFrame of desired relationships.
 
@@ -230,6 +789,14 @@ class SupabaseLoader:
             source_key: Name of the source ID column in both join_df and join_table
             target_key: Name of the target ID column in both join_df and join_table
             chunk_size: Number of rows to process in each batch
+            keys_unique: Whether (source_key, target_key) is the table's unique key
+            bulk_delete: Remove stale relations with the delete_join_pairs database
+                function, max_chunk_bytes of pairs per call. Falls back to one
+                DELETE per source if the function isn't installed.
+            max_chunk_bytes: Upper bound on the request body of one bulk delete
+
+        Returns:
+            Dictionary with the number of relations added and removed
 
         Example:
             # DataFrame with desired relationships
@@ -247,49 +814,28 @@ class SupabaseLoader:
         """
         # Remove any null values
         join_df = join_df.dropna(subset=[source_key, target_key])
+        desired = join_df[[source_key, target_key]].astype("int64").drop_duplicates()
 
         # Fetch existing rows from the table
         print(f"\nFetching existing rows from {join_table}...")
-        existing_rows = []
-        page_size = chunk_size  # Number of rows to fetch per request
-        source_ids = join_df[source_key].unique().tolist()
-
-        # Process source IDs in chunks to avoid overly long queries
-        for i in range(0, len(source_ids), chunk_size):
-            source_id_chunk = source_ids[i : i + chunk_size]
-            response = (
-                self.client.table(join_table)
-                .select(f"{source_key},{target_key}")
-                .in_(source_key, source_id_chunk)  # Filter rows by source_key
-                .limit(page_size)
-                .execute()
-            )
-
-            batch = response.data
-            if batch:
-                existing_rows.extend(batch)
-
-        print(f"Fetched {len(existing_rows):,} existing rows.")
-
-        # Build sets for comparison
-        desired_relations = {
-            (int(row[source_key]), int(row[target_key]))
-            for _, row in join_df.iterrows()
-        }
-        existing_relations = {
-            (int(row[source_key]), int(row[target_key])) for row in existing_rows
-        }
+        source_ids = desired[source_key].unique().tolist()
+        existing = self._fetch_relations(
+            join_table, source_key, target_key, source_ids, chunk_size
+        )
+        print(f"Fetched {len(existing):,} existing rows.")
 
         # Calculate differences
-        relations_to_add = desired_relations - existing_relations
-        relations_to_remove = existing_relations - desired_relations
+        diff = desired.merge(existing, how="outer", indicator=True)
+        relations_to_add = diff.loc[
+            diff["_merge"] == "left_only", [source_key, target_key]
+        ]
+        relations_to_remove = diff.loc[
+            diff["_merge"] == "right_only", [source_key, target_key]
+        ]
 
         # Add new relations in batches using upsert to handle duplicates
-        if relations_to_add:
-            new_records = [
-                {source_key: source_id, target_key: target_id}
-                for source_id, target_id in relations_to_add
-            ]
+        if not relations_to_add.empty:
+            new_records = relations_to_add.to_dict("records")
 
             for i in range(0, len(new_records), chunk_size):
                 chunk = new_records[i : i + chunk_size]
@@ -302,36 +848,167 @@ class SupabaseLoader:
                 else:
                     self.client.table(join_table).upsert(json=chunk).execute()
 
-        # Remove old relations in batches, grouping by source_id to minimize API calls
-        if relations_to_remove:
-            # Group relations to remove by source_id
-            relations_by_source = {}
-            for source_id, target_id in relations_to_remove:
-                if source_id not in relations_by_source:
-                    relations_by_source[source_id] = set()
-                relations_by_source[source_id].add(target_id)
-
-            # Process each source_id's relations in a single delete call where possible
-            total_removed = 0
-            for source_id, target_ids in relations_by_source.items():
-                target_id_chunks = list(target_ids)
-                for i in range(0, len(target_id_chunks), chunk_size):
-                    chunk = target_id_chunks[i : i + chunk_size]
-                    try:
-                        # Try batch delete first
-                        self.client.table(join_table).delete().eq(
-                            source_key, source_id
-                        ).in_(target_key, chunk).execute()
-                        total_removed += len(chunk)
-                    except Exception:
-                        # Fall back to individual deletes if the URL is too long
-                        for target_id in chunk:
-                            self.client.table(join_table).delete().eq(
-                                source_key, source_id
-                            ).eq(target_key, target_id).execute()
-                            total_removed += 1
-
-        print(f"Synchronization complete for {join_table}.")
+        # Remove old relations
+        removed = 0 if relations_to_remove.empty else None
+        if removed is None and bulk_delete:
+            removed = self._delete_pairs(
+                join_table, relations_to_remove, source_key, target_key, max_chunk_bytes
+            )
+        if removed is None:
+            removed = self._delete_by_source(
+                join_table, relations_to_remove, source_key, target_key, chunk_size
+            )
+
+        print(
+            f"Synchronization complete for {join_table}: added {len(relations_to_add):,},"
+            f" removed {removed:,} relations."
+        )
+        return {"added": len(relations_to_add), "removed": removed}
+
+    def _delete_pairs(
+        self,
+        join_table: str,
+        relations: pd.DataFrame,
+        source_key: str,
+        target_key: str,
+        max_chunk_bytes: int,
+    ) -> Optional[int]:
+        """
+        Delete (source, target) pairs through the delete_join_pairs function,
+        one call per max_chunk_bytes of pairs.
+
+        Returns:
+            Number of rows deleted, or None if the function doesn't exist in
+            the database (the migration hasn't been applied)
+        """
+        sources = relations[source_key].to_numpy()
+        targets = relations[target_key].to_numpy()
+        # Each pair costs its two numbers plus two separators in the JSON body
+        sizes = (
+            relations[source_key].astype(str).str.len()
+            + relations[target_key].astype(str).str.len()
+            + 2
+        ).tolist()
+
+        removed = 0
+        for start, end in _chunk_ranges(sizes, len(sizes), max_chunk_bytes):
+            try:
+                response = self.client.rpc(
+                    "delete_join_pairs",
+                    {
+                        "join_table": join_table,
+                        "source_key": source_key,
+                        "target_key": target_key,
+                        "sources": sources[start:end].tolist(),
+                        "targets": targets[start:end].tolist(),
+                    },
+                ).execute()
+            except APIError as e:
+                if e.code == MISSING_FUNCTION and removed == 0:
+                    print(
+                        "delete_join_pairs is not installed; "
+                        "deleting relations one source at a time."
+                    )
+                    return None
+                raise
+            removed += response.data
+        return removed
+
+    def _delete_by_source(
+        self,
+        join_table: str,
+        relations: pd.DataFrame,
+        source_key: str,
+        target_key: str,
+        chunk_size: int,
+    ) -> int:
+        """
+        Delete (source, target) pairs with one DELETE per source and chunk_size targets.
+
+        Returns:
+            Number of rows deleted
+        """
+        removed = 0
+        for source_id, target_ids in relations.groupby(source_key)[target_key]:
+            source_id = int(source_id)
+            target_id_chunks = target_ids.tolist()
+            for i in range(0, len(target_id_chunks), chunk_size):
+                chunk = target_id_chunks[i : i + chunk_size]
+                try:
+                    # Try batch delete first
+                    response = (
+                        self.client.table(join_table)
+                        .delete(count=CountMethod.exact)
+                        .eq(source_key, source_id)
+                        .in_(target_key, chunk)
+                        .execute()
+                    )
+                    removed += response.count or 0
+                except Exception:
+                    # Fall back to individual deletes if the URL is too long
+                    for target_id in chunk:
+                        response = (
+                            self.client.table(join_table)
+                            .delete(count=CountMethod.exact)
+                            .eq(source_key, source_id)
+                            .eq(target_key, target_id)
+                            .execute()
+                        )
+                        removed += response.count or 0
+        return removed
+
+    def _fetch_relations(
+        self,
+        join_table: str,
+        source_key: str,
+        target_key: str,
+        source_ids: List[int],
+        chunk_size: int,
+    ) -> pd.DataFrame:
+        """
+        Fetch every existing (source, target) pair of a join table for the given sources.
+
+        Source ids are queried chunk_size at a time. Each query is paginated on
+        (source_key, target_key) order, asking for the pairs after the last one
+        seen, so sources with many relations are never cut off at a page limit.
+
+        Returns:
+            DataFrame with int64 source_key and target_key columns
+        """
+        sources, targets = [], []
+        for i in range(0, len(source_ids), chunk_size):
+            source_id_chunk = source_ids[i : i + chunk_size]
+            last = None
+            while True:
+                query = (
+                    self.client.table(join_table)
+                    .select(f"{source_key},{target_key}")
+                    .in_(source_key, source_id_chunk)  # Filter rows by source_key
+                )
+                if last is not None:
+                    query = query.or_(
+                        f"{source_key}.gt.{last[0]},"
+                        f"and({source_key}.eq.{last[0]},{target_key}.gt.{last[1]})"
+                    )
+                batch = (
+                    query.order(source_key)
+                    .order(target_key)
+                    .limit(JOIN_PAGE_SIZE)
+                    .execute()
+                    .data
+                )
+                sources.extend(row[source_key] for row in batch)
+                targets.extend(row[target_key] for row in batch)
+                if len(batch) < JOIN_PAGE_SIZE:
+                    break
+                last = (batch[-1][source_key], batch[-1][target_key])
+
+        return pd.DataFrame(
+            {
+                source_key: pd.Series(sources, dtype="int64"),
+                target_key: pd.Series(targets, dtype="int64"),
+            }
+        )
 
     def print_load_summary(self, table_name: str, summary: dict) -> None:
         """
@@ -342,7 +1019,31 @@ class SupabaseLoader:
             operations: Dictionary with counts of 'inserted' and 'updated' records
         """
         operations = summary.get("operations", {})
-        results = summary.get("results", [])
-        print(f"\nProcessed {len(results):,} total records in {table_name}:")
+        total = operations["inserted"] + operations["updated"]
+        print(f"\nProcessed {total:,} total records in {table_name}:")
         print(f" Inserted: {operations['inserted']:,}")
         print(f" Updated: {operations['updated']:,}")
+
+    def print_throughput(self, stats: _LoadStats, elapsed: float) -> None:
+        """
+        Print the throughput of an insert and the chunk sizes it ended up using.
+
+        Args:
+            stats: Chunks sent, retries and splits collected during the insert
+            elapsed: Wall-clock time of the insert in seconds
+        """
+        if not stats.chunks:
+            return
+        rows = [n for n, _ in stats.chunks]
+        sizes = [size for _, size in stats.chunks]
+        elapsed = max(elapsed, 1e-9)
+        print(
+            f" Throughput: {sum(rows) / elapsed:,.0f} rows/s,"
+            f" {sum(sizes) / elapsed / 1_000_000:,.2f} MB/s"
+            f" over {len(rows):,} requests in {elapsed:,.1f}s"
+        )
+        print(
+            f" Chunk rows min/median/max: {min(rows):,}/{statistics.median(rows):,.0f}/{max(rows):,};"
+            f" chunk KB median/max: {statistics.median(sizes) / 1024:,.0f}/{max(sizes) / 1024:,.0f};"
+            f" {stats.splits:,} splits, {stats.retries:,} retries"
+        )
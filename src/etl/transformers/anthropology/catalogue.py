@@ -24,12 +24,16 @@ def fill_na(series: pd.Series, na_value: Any) -> None:
 
 def transform_anthropology_catalogue(
     df: pd.DataFrame,
+    cultures: Cultures | None = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Transforms the anthropology catalogue DataFrame by cleaning and normalizing fields.
 
     Args:
         df: The input DataFrame containing the anthropology catalogue data.
+        cultures: Matcher for the cultural attributions. Defaults to one built
+            from the local snapshot of the Airtable cultures table; pass one in
+            to reuse it (and its Airtable fetch) elsewhere in a script.
 
     Returns:
         A transformed DataFrame with cleaned and normalized fields.
@@ -72,33 +76,18 @@ def transform_anthropology_catalogue(
     df["material_type"] = cleaned_materials
 
     # Use Cultures to process cultural_attribution and build a join table
-    cultures = Cultures()
+    if cultures is None:
+        cultures = Cultures(incremental=True, check_deletions=True)
 
-    join_rows = []
-    matched_ids_series = []
-
-    for _, row in df.iterrows():
-        # IRN identifies the catalogue record; fall back to index if missing
-        irn = row.get("irn") if "irn" in row.index else None
-
-        matched_ids: list = []
-        if row.get("cultural_attribution_verbatim"):
-            # cultural_attribution is expected to be a list of motif strings
-            matched_ids = cultures.match_list(row["cultural_attribution_verbatim"])
-
-            for cid in matched_ids:
-                join_rows.append({"catalogue_irn": int(irn), "cultures_id": int(cid)})  # type: ignore
-
-        matched_ids_series.append(matched_ids)
-
-    # attach the list of matched culture ids to the catalogue rows for convenience
-    df["cultures_ids"] = matched_ids_series
-
-    # build join table DataFrame
-    join_df = pd.DataFrame(join_rows, columns=["catalogue_irn", "cultures_id"])
+    # Match each distinct motif once and build the join table in one batch
+    _, join_df = cultures.match_series(
+        df.set_index("irn")["cultural_attribution_verbatim"]
+    )
+    join_df = join_df.rename(columns={"irn": "catalogue_irn"}).astype(
+        {"catalogue_irn": "int64"}
+    )
 
-    # Drop "cultures_id" column
-    df.drop(columns=["cultures_ids", "cultural_attribution"], inplace=True)
+    df.drop(columns=["cultural_attribution"], inplace=True)
 
     # Rename columns to match target schema
     df.rename(
@@ -1,28 +1,55 @@
 import re
+import time
 import unicodedata
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 
 import pandas as pd
 from pyairtable import Table
 
 from config.settings import settings
+from etl.extractors.airtable_snapshot import AirtableSnapshot
 
 from ..utils import to_pg_array
 
+# Motif parsing patterns, compiled once (see Cultures.extract_terms)
+PARENTHETICAL = re.compile(r"\(([^)]+)\)")
+PARENTHETICAL_SEPARATORS = re.compile(r"[,/]| or ")
+MAIN_SEPARATORS = re.compile(r",|/| - | or |; ")
+
+# Airtable accepts at most this many records per update request
+AIRTABLE_BATCH_SIZE = 10
+
+# Seconds between Airtable requests, under its limit of 5 requests/s per base
+AIRTABLE_REQUEST_INTERVAL = 0.25
+
 
 class Cultures:
     """
     Matches motif strings to culture names and their parents using a lookup built from a cultures DataFrame.
     """
 
-    def __init__(self, cultures: pd.DataFrame = pd.DataFrame()) -> None:
+    def __init__(
+        self,
+        cultures: pd.DataFrame = pd.DataFrame(),
+        incremental: bool = False,
+        check_deletions: bool = False,
+    ) -> None:
         """
         Initializes the matcher and builds the lookup dictionaries.
 
         Args:
             cultures: A DataFrame with 'name', 'endonyms', and 'parent_culture' columns.
+            incremental: When fetching from Airtable, keep a local snapshot and only
+                fetch cultures modified since the last sync.
+            check_deletions: With incremental, also drop cultures deleted since
+                the last sync, at the cost of listing every record id.
         """
 
+        self.incremental = incremental
+        self.check_deletions = check_deletions
+        self.table: Table | None = None
+        # Fields of each Airtable record as fetched, by record id
+        self.fetched_fields: Dict[str, Dict] = {}
         if cultures.empty:
             self.table = self._fetch_airtable_data()
             self.cultures = self.airtable_to_dataframe()
@@ -39,6 +66,35 @@ class Cultures:
         self.culture_lookup = self._build_culture_lookup(self.cultures)
         self.parent_lookup = self._build_parent_lookup(self.cultures)
 
+        # Hierarchy closure, built once: ancestors[id] and descendants[id] map
+        # each related culture id to its distance (1 for a direct parent/child)
+        self.ancestors = self._build_ancestors(self.parent_lookup_id)
+        self.descendants: Dict[int, Dict[int, int]] = {}
+        for cid, ancestors in self.ancestors.items():
+            for ancestor, depth in ancestors.items():
+                self.descendants.setdefault(ancestor, {})[cid] = depth
+        # The same closure as (ancestor_id, descendant_id, depth) rows
+        self.closure = pd.DataFrame(
+            [
+                (ancestor, cid, depth)
+                for cid, ancestors in self.ancestors.items()
+                for ancestor, depth in ancestors.items()
+            ],
+            columns=["ancestor_id", "descendant_id", "depth"],
+            dtype="int64",
+        )
+
+        # Culture rows by id, for lookups by id without scanning the DataFrame
+        self.records_by_id: Dict[int, Dict] = {}
+        for record in self.cultures.to_dict("records"):
+            cid = self._to_id(record["id"])
+            if cid is not None:
+                self.records_by_id.setdefault(cid, record)
+
+        # Culture ids matched by each distinct motif. Catalogues repeat the same
+        # few thousand motifs across many objects, so each is parsed only once.
+        self._motif_matches: Dict[str, tuple] = {}
+
     def _fetch_airtable_data(self):
         """Connects to Airtable using settings from the config."""
         api_key = settings.airtable_pat
@@ -54,7 +110,13 @@ class Cultures:
 
     def airtable_to_dataframe(self) -> pd.DataFrame:
         """Fetches all records from the given Airtable table and converts them to a DataFrame."""
-        records = self.table.all()
+        if self.incremental:
+            records = AirtableSnapshot(
+                self.table, check_deletions=self.check_deletions
+            ).sync()
+        else:
+            records = self.table.all()
+        self.fetched_fields = {record["id"]: record["fields"] for record in records}
         cultures = pd.DataFrame([record["fields"] for record in records]).fillna("")
         cultures["record_id"] = [record["id"] for record in records]
         cultures["parent_culture"] = cultures["name (from parent_culture)"].apply(
@@ -119,6 +181,9 @@ class Cultures:
         """
         Normalize text to remove diacritic markers
         """
+        if s.isascii():
+            # Nothing to decompose
+            return s
         nkfd = unicodedata.normalize("NFKD", s)
         return "".join(ch for ch in nkfd if not unicodedata.combining(ch))
 
@@ -137,25 +202,25 @@ class Cultures:
         )
 
         # Find text inside parentheses (e.g. "(A, B or C)") and capture each group's contents.
-        parentheticals = re.findall(r"\(([^)]+)\)", term)
+        parentheticals = PARENTHETICAL.findall(term)
 
         terms = []
         # Process each parenthetical group: split on commas, slashes or the word " or ",
         # strip whitespace and collect non-empty tokens.
         for group in parentheticals:
-            for sub in re.split(r"[,/]| or ", group):
+            for sub in PARENTHETICAL_SEPARATORS.split(group):
                 sub = sub.strip()
                 if sub:
                     terms.append(sub)
 
         # Remove the parenthetical portions from the original string so we can parse
         # the "main" part (outside parentheses) separately.
-        main = re.sub(r"\([^)]+\)", "", term)
+        main = PARENTHETICAL.sub("", term)
 
         # Split the remaining main string on common separators (comma, slash, space-dash-space)
         # and the word " or ". We intentionally only split on a spaced dash (` - `)
         # to preserve hyphenated names like "Jama-Coaque".
-        for part in re.split(r",|/| - | or |; ", main):
+        for part in MAIN_SEPARATORS.split(main):
             part = part.strip()
             if part:
                 terms.append(part)
@@ -222,6 +287,40 @@ class Cultures:
                 parent_lookup[cid] = parent_id
         return parent_lookup
 
+    @staticmethod
+    def _to_id(value) -> int | None:
+        """Converts a culture id to int, or None if it isn't one."""
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            return None
+
+    @classmethod
+    def _build_ancestors(
+        cls, parent_lookup_id: Dict[str, int]
+    ) -> Dict[int, Dict[int, int]]:
+        """
+        Build a mapping from culture id -> {ancestor id: depth} by walking up from
+        every culture once. Non-integer ids are skipped and cycles are cut.
+        """
+        parents: Dict[int, int] = {}
+        for child_id, parent_id in parent_lookup_id.items():
+            child, parent = cls._to_id(child_id), cls._to_id(parent_id)
+            if child is not None and parent is not None and parent != child:
+                parents[child] = parent
+
+        ancestors: Dict[int, Dict[int, int]] = {}
+        for cid in parents:
+            chain: Dict[int, int] = {}
+            current = cid
+            while current in parents and parents[current] not in chain:
+                current = parents[current]
+                if current == cid:
+                    break
+                chain[current] = len(chain) + 1
+            ancestors[cid] = chain
+        return ancestors
+
     @staticmethod
     def _build_parent_lookup(cultures: pd.DataFrame) -> Dict[str, str]:
         """
@@ -263,8 +362,14 @@ class Cultures:
         if not motif:
             return []
 
-        # Debug for problematic motifs
+        matches = self._motif_matches.get(motif)
+        if matches is None:
+            matches = tuple(self._match_motif(motif))
+            self._motif_matches[motif] = matches
+        return list(matches)
 
+    def _match_motif(self, motif: str) -> List[int]:
+        """Matches one motif without the cache; see match()."""
         matched = {(self.name_id_lookup.get(motif.lower(), ""))}
 
         if not bool(*matched):
@@ -330,6 +435,58 @@ class Cultures:
 
         return list(children_only)
 
+    def match_series(self, motifs: pd.Series) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Matches a Series of motif lists (one list per object) in one batch.
+
+        Gives the same matches as calling match_list on each list, but each
+        distinct motif is matched once and the join rows are built with
+        explode/merge rather than row by row.
+
+        Args:
+            motifs: A Series of lists of motif strings, indexed by object key.
+
+        Returns:
+            A Series of matched culture id lists aligned with motifs, and a join
+            DataFrame with one row per match: the object key (in a column named
+            after the Series index, or "index") and "cultures_id".
+        """
+        key = motifs.index.name or "index"
+
+        # One (object position, motif) row per motif, skipping empty motifs
+        exploded = pd.Series(motifs.to_numpy(), dtype=object).explode()
+        exploded = exploded[exploded.notna() & (exploded != "")]
+        distinct = exploded.unique()
+        matches = pd.Series(
+            [self.match(motif) for motif in distinct], index=distinct, dtype=object
+        )
+
+        # One (object position, culture id) row per distinct match
+        matched = exploded.map(matches).explode().dropna()
+        pairs = pd.DataFrame(
+            {"position": matched.index, "cultures_id": matched.to_numpy()}
+        ).drop_duplicates()
+
+        # Remove any culture that is a parent of another culture matched by the
+        # same object, as match_list does
+        parent_pairs = pd.MultiIndex.from_arrays(
+            [pairs["position"], pairs["cultures_id"].map(self.parent_lookup)]
+        )
+        pairs = pairs[~pd.MultiIndex.from_frame(pairs).isin(parent_pairs)]
+
+        # Collect each object's ids (groupby().agg(list) runs a slow Python path)
+        id_lists: List[list] = [[] for _ in range(len(motifs))]
+        for position, cid in zip(pairs["position"].tolist(), pairs["cultures_id"]):
+            id_lists[position].append(cid)
+        ids = pd.Series(id_lists, index=motifs.index, dtype=object)
+        join_df = pd.DataFrame(
+            {
+                key: motifs.index.to_numpy()[pairs["position"].to_numpy(dtype="int64")],
+                "cultures_id": pairs["cultures_id"].astype("int64").to_numpy(),
+            }
+        )
+        return ids, join_df
+
     def get_descendant_ids(self, parent_id: int | str) -> List[int]:
         """
         Return all descendant culture IDs (children, grandchildren, etc.) for the given parent ID.
@@ -340,39 +497,50 @@ class Cultures:
         Returns:
             List[int] of descendant culture ids. Non-integer ids are skipped.
         """
-        # Normalize parent id to string because lookups are stored as strings
-        parent_key = str(parent_id)
+        return list(self.descendants.get(self._to_id(parent_id), {}))  # type: ignore
 
-        # Build parent -> set(children) mapping from self.parent_lookup_id (child -> parent)
-        parent_to_children: Dict[str, Set[str]] = {}
-        for child_id, par_id in self.parent_lookup_id.items():
-            if not par_id:
-                continue
-            parent_to_children.setdefault(str(par_id), set()).add(str(child_id))
-
-        # Traverse breadth-first/stack to collect all descendants
-        descendants: Set[str] = set()
-        stack = list(parent_to_children.get(parent_key, []))
-        while stack:
-            cid = stack.pop()
-            if cid in descendants:
-                continue
-            descendants.add(cid)
-            # enqueue this child's children
-            for grandchild in parent_to_children.get(cid, []):
-                if grandchild not in descendants:
-                    stack.append(grandchild)
-
-        # Convert to ints where possible, skip non-integer ids
-        out: List[int] = []
-        for cid in descendants:
-            try:
-                out.append(int(cid))
-            except (ValueError, TypeError):
-                # skip ids that can't be converted to int
-                continue
+    def get_ancestor_ids(self, id: int | str) -> List[int]:
+        """
+        Return all ancestor culture IDs (parent, grandparent, etc.) for the given ID,
+        nearest first.
 
-        return out
+        Args:
+            id: culture id (int or str)
+
+        Returns:
+            List[int] of ancestor culture ids.
+        """
+        return list(self.ancestors.get(self._to_id(id), {}))  # type: ignore
+
+    def match_counts(self, cultures_ids: pd.Series) -> pd.DataFrame:
+        """
+        Counts matches per culture, directly and including all descendants.
+
+        Args:
+            cultures_ids: One culture id per match, e.g. the "cultures_id"
+                column of the catalogue join table.
+
+        Returns:
+            A DataFrame indexed by culture id, with a row for every culture, and
+            "match_count" and "recursive_match_count" columns.
+        """
+        ids = pd.to_numeric(self.cultures["id"], errors="coerce").dropna()
+        counts = (
+            pd.Series(cultures_ids, dtype="int64")
+            .value_counts()
+            .reindex(ids.astype("int64").unique(), fill_value=0)
+            .rename("match_count")
+        )
+        counts.index.name = "id"
+
+        # Every culture's count plus those of all its descendants
+        descendant_counts = (
+            self.closure.join(counts, on="descendant_id")
+            .groupby("ancestor_id")["match_count"]
+            .sum()
+        )
+        recursive = counts + descendant_counts.reindex(counts.index, fill_value=0)
+        return pd.DataFrame({"match_count": counts, "recursive_match_count": recursive})
 
     def update_record(self, record_id: str, fields: Dict) -> Dict:
         """
@@ -391,6 +559,71 @@ class Cultures:
         updated_record = self.table.update(record_id, fields)
         return updated_record  # type: ignore
 
+    def batch_update_records(
+        self,
+        updates: Dict[str, Dict],
+        batch_size: int = AIRTABLE_BATCH_SIZE,
+        interval: float = AIRTABLE_REQUEST_INTERVAL,
+    ) -> List[Dict]:
+        """
+        Update many records in the Airtable table, batch_size records per request
+        and at most one request every interval seconds.
+
+        Args:
+            updates: Fields to update, by Airtable record ID.
+            batch_size: Records per request (Airtable allows at most 10).
+            interval: Minimum seconds between the start of two requests.
+
+        Returns:
+            The updated records.
+        """
+        if not self.table:
+            raise RuntimeError("Airtable table is not initialized.")
+
+        records = [{"id": record_id, "fields": f} for record_id, f in updates.items()]
+        updated_records: List[Dict] = []
+        last_request = None
+        for start in range(0, len(records), batch_size):
+            if last_request is not None:
+                wait = interval - (time.monotonic() - last_request)
+                if wait > 0:
+                    time.sleep(wait)
+            last_request = time.monotonic()
+            updated_records += self.table.batch_update(  # type: ignore
+                records[start : start + batch_size]
+            )
+        return updated_records
+
+    def update_match_counts(self, counts: pd.DataFrame) -> int:
+        """
+        Write match counts back to Airtable, sending only the records whose
+        counts differ from the fetched ones.
+
+        Args:
+            counts: match_counts() output, indexed by culture id.
+
+        Returns:
+            The number of records updated.
+        """
+        airtable_ids = self.cultures.set_index(
+            pd.to_numeric(self.cultures["id"], errors="coerce")
+        )["airtable_id"]
+        counts = counts.join(airtable_ids, how="inner")
+
+        updates = {}
+        for row in counts.itertuples():
+            fields = {
+                "match_count": int(row.match_count),
+                "recursive_match_count": int(row.recursive_match_count),
+            }
+            fetched = self.fetched_fields.get(row.airtable_id, {})
+            if any(fetched.get(field) != value for field, value in fields.items()):
+                updates[row.airtable_id] = fields
+
+        self.batch_update_records(updates)
+        print(f"Updated match counts for {len(updates)} of {len(counts)} cultures")
+        return len(updates)
+
     def get_culture_by_id(self, id: int | str) -> Dict | None:
         """
         Returns the culture record for a given culture id, or None if not found.
@@ -401,13 +634,8 @@ class Cultures:
         Returns:
             The culture record as a dictionary, or None if not found.
         """
-        if not self.cultures.empty:
-            record = self.cultures[self.cultures["id"] == id]
-            if not record.empty:
-                return record.iloc[0].to_dict()
-            else:
-                return None
-        return None
+        record = self.records_by_id.get(self._to_id(id))  # type: ignore
+        return dict(record) if record is not None else None
 
     def get_name_by_id(self, id: int | str) -> str:
         """
@@ -419,12 +647,17 @@ class Cultures:
         Returns:
             The culture name as a string, or None if not found.
         """
-        if type(id) is str:
-            id = int(id)
-        if not self.cultures.empty:
-            record = self.cultures[self.cultures["id"] == id]
-            if not record.empty:
-                return record.iloc[0]["name"]
-            else:
-                return ""
-        return ""
+        record = self.records_by_id.get(self._to_id(id))  # type: ignore
+        return record["name"] if record is not None else ""
+
+    def names_for_ids(self, ids: List[int | str]) -> List[str]:
+        """
+        Returns the culture names for a list of culture ids.
+
+        Args:
+            ids: The culture ids.
+
+        Returns:
+            The culture names, in the same order, with "" for ids not found.
+        """
+        return [self.get_name_by_id(id) for id in ids]
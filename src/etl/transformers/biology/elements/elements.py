@@ -1,5 +1,5 @@
 import pandas as pd
-from ...utils import to_pg_array
+from ...utils import AhoCorasick, to_pg_array
 
 
 class Elements:
@@ -8,6 +8,10 @@ class Elements:
     def __init__(self, elements: list[dict]):
         self.elements = self.airtable_to_dataframe(elements)
         self.lookup = self._build_elements_lookup(self.elements)
+        # Finds every lookup key in a string in one pass; ranks follow the
+        # lookup's priority order
+        self.matcher = AhoCorasick(list(self.lookup))
+        self._lookup_values = list(self.lookup.values())
 
     @staticmethod
     def _build_elements_lookup(elements: pd.DataFrame) -> None:
@@ -93,11 +97,11 @@ class Elements:
 
         matches = []
 
-        # Iterate over sorted keys to prioritize longer matches first
-        for key, value in self.lookup.items():
-            if key in cleaned_element:
-                matches.append(value)
-                break
+        # The highest priority key found anywhere in the element: fewest
+        # children first, then the longest key
+        rank = self.matcher.first_match(cleaned_element)
+        if rank is not None:
+            matches.append(self._lookup_values[rank])
 
         return matches
 
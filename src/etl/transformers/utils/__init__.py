@@ -1,5 +1,7 @@
 from typing import Iterable, List
 
+from .aho_corasick import AhoCorasick
+
 
 def flatten_field(
     field: Iterable[List[dict]] | None, field_name: str
@@ -36,4 +38,4 @@ def rename_dict_keys(d: dict, key_map: dict) -> dict:
     return {key_map.get(k, k): v for k, v in d.items()}
 
 
-__all__ = ["flatten_field", "to_pg_array", "rename_dict_keys"]
+__all__ = ["AhoCorasick", "flatten_field", "to_pg_array", "rename_dict_keys"]
@@ -0,0 +1,89 @@
+from collections import deque
+from typing import Iterator, List
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick automaton for finding many substrings in a text in one pass.
+
+    Patterns are ranked by their position in the list they are built from;
+    lower ranks win in first_match(). Build the automaton once and reuse it:
+    matching a text costs O(len(text) + number of matches), however many
+    patterns there are.
+
+    Example:
+        >>> matcher = AhoCorasick(["ulna", "femur", "mur"])
+        >>> matcher.first_match("left femur fragment")
+        1
+        >>> sorted(matcher.iter_matches("left femur fragment"))
+        [(10, 1), (10, 2)]
+    """
+
+    def __init__(self, patterns: List[str]):
+        # Trie: goto[state] maps a character to the next state
+        self.goto: List[dict] = [{}]
+        # Pattern ranks ending exactly at each state
+        outputs: List[List[int]] = [[]]
+        for rank, pattern in enumerate(patterns):
+            if not pattern:
+                raise ValueError("Patterns must be non-empty strings")
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    outputs.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            outputs[state].append(rank)
+
+        # Failure links, breadth first: fail[state] is the state for the
+        # longest proper suffix of state's string that is also in the trie
+        self.fail = [0] * len(self.goto)
+        self.outputs = outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                outputs[child] = outputs[child] + outputs[self.fail[child]]
+
+        # Lowest rank reachable from each state, or len(patterns) if none
+        none = len(patterns)
+        self.best = [min(ranks, default=none) for ranks in outputs]
+        self.none = none
+
+    def _states(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yields (end index, state) after consuming each character of text."""
+        goto, fail = self.goto, self.fail
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            yield i + 1, state
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yields (end index, pattern rank) for every occurrence of every pattern."""
+        for end, state in self._states(text):
+            for rank in self.outputs[state]:
+                yield end, rank
+
+    def first_match(self, text: str) -> int | None:
+        """Returns the lowest rank of any pattern occurring in text, or None."""
+        # Same walk as _states, inlined: this is the hot loop
+        goto, fail, best = self.goto, self.fail, self.best
+        found = self.none
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best[state] < found:
+                found = best[state]
+        return found if found < self.none else None
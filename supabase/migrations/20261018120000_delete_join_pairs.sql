@@ -0,0 +1,32 @@
+-- Deletes (source, target) pairs from a join table in one statement.
+-- Used by SupabaseLoader.sync_join_table to remove stale relations in bulk;
+-- returns the number of rows deleted.
+create or replace function "public"."delete_join_pairs"(
+    "join_table" text,
+    "source_key" text,
+    "target_key" text,
+    "sources" bigint[],
+    "targets" bigint[]
+) returns integer
+    language plpgsql
+    as $$
+declare
+    removed integer;
+begin
+    execute format('
+        delete from %I as j
+        using unnest($1, $2) as p(source, target)
+        where j.%I = p.source and j.%I = p.target',
+        join_table, source_key, target_key)
+    using sources, targets;
+
+    get diagnostics removed = row_count;
+    return removed;
+end;$$;
+
+
+alter function "public"."delete_join_pairs"(text, text, text, bigint[], bigint[]) owner to "postgres";
+
+revoke all on function "public"."delete_join_pairs"(text, text, text, bigint[], bigint[]) from public, "anon", "authenticated";
+
+grant execute on function "public"."delete_join_pairs"(text, text, text, bigint[], bigint[]) to "service_role";
@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import pytest
 
 from etl.extractors import airtable_fetcher
@@ -47,3 +49,41 @@ def test_fetch_data_from_airtable_missing_credentials(monkeypatch):
         airtable_fetcher.fetch_data_from_airtable("MyTable")
 
     assert "Airtable credentials missing" in str(excinfo.value)
+
+
+class SnapshotTable:
+    """A table whose records can change between incremental syncs."""
+
+    records = {}
+
+    def __init__(self, api_key, base_id, table_name):
+        self.base = SimpleNamespace(id=base_id)
+        self.name = table_name
+
+    def all(self, formula=None, fields=None):
+        # Every record counts as modified, so the test needs no timestamps
+        return list(self.records.values())
+
+
+def test_incremental_fetch_drops_deleted_records(monkeypatch, tmp_path):
+    monkeypatch.setattr(airtable_fetcher, "Table", SnapshotTable)
+    monkeypatch.setattr(airtable_fetcher.settings, "airtable_pat", "fake_key")
+    monkeypatch.setattr(airtable_fetcher.settings, "airtable_base_id", "fake_base")
+    monkeypatch.setattr(
+        airtable_fetcher.settings, "airtable_snapshot_dir", str(tmp_path)
+    )
+    monkeypatch.setattr(
+        SnapshotTable,
+        "records",
+        {
+            "rec1": {"id": "rec1", "fields": {"name": "femur"}},
+            "rec2": {"id": "rec2", "fields": {"name": "tibia"}},
+        },
+    )
+    fetch = airtable_fetcher.fetch_data_from_airtable
+    fetch("Elements", incremental=True, check_deletions=True)
+
+    del SnapshotTable.records["rec2"]
+    records = fetch("Elements", incremental=True, check_deletions=True)
+
+    assert [record["id"] for record in records] == ["rec1"]
@@ -0,0 +1,141 @@
+"""Tests for the incremental Airtable snapshot.
+
+A fake `Table` stands in for pyairtable: it records the options of every
+`all()` call and answers modified-since formulas from per-record timestamps.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from etl.extractors.airtable_snapshot import AirtableSnapshot
+
+
+class FakeTable:
+    name = "Paleo Elements"
+
+    def __init__(self, base_id="appPaleo"):
+        self.base = SimpleNamespace(id=base_id)
+        self.records = {}
+        self.modified = {}
+        self.calls = []
+
+    def put(self, record_id, name):
+        self.records[record_id] = {"id": record_id, "fields": {"name": name}}
+        self.modified[record_id] = datetime.now(timezone.utc)
+
+    def all(self, formula=None, fields=None):
+        self.calls.append({"formula": formula, "fields": fields})
+        records = list(self.records.values())
+        if formula:
+            # IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('<iso>'))
+            since = datetime.fromisoformat(formula.split("'")[1].replace("Z", "+00:00"))
+            records = [r for r in records if self.modified[r["id"]] > since]
+        return records
+
+
+def age(table, days):
+    """Backdates every record's modified time."""
+    for record_id in table.modified:
+        table.modified[record_id] -= timedelta(days=days)
+
+
+def test_first_sync_fetches_everything(tmp_path):
+    table = FakeTable()
+    table.put("rec1", "femur")
+    table.put("rec2", "tibia")
+
+    records = AirtableSnapshot(table, snapshot_dir=tmp_path).sync()
+
+    assert [r["id"] for r in records] == ["rec1", "rec2"]
+    assert table.calls == [{"formula": None, "fields": None}]
+    assert (tmp_path / "appPaleo_paleo_elements.json").exists()
+
+
+def changed_table(tmp_path, **options):
+    """A synced table in which rec2 then changed, rec4 was added and rec3 deleted."""
+    table = FakeTable()
+    table.put("rec1", "femur")
+    table.put("rec2", "tibia")
+    table.put("rec3", "ulna")
+    AirtableSnapshot(table, snapshot_dir=tmp_path, **options).sync()
+    age(table, days=1)
+
+    table.put("rec2", "fibula")
+    table.put("rec4", "radius")
+    del table.records["rec3"]
+    table.calls.clear()
+    return table
+
+
+def test_sync_merges_changes_in_one_request(tmp_path):
+    table = changed_table(tmp_path)
+
+    records = AirtableSnapshot(table, snapshot_dir=tmp_path).sync()
+
+    # The deleted rec3 stays until the next full refresh
+    assert {r["id"]: r["fields"]["name"] for r in records} == {
+        "rec1": "femur",
+        "rec2": "fibula",
+        "rec3": "ulna",
+        "rec4": "radius",
+    }
+    assert len(table.calls) == 1
+    assert table.calls[0]["formula"].startswith("IS_AFTER(LAST_MODIFIED_TIME()")
+
+
+def test_unchanged_table_costs_one_request(tmp_path):
+    table = FakeTable()
+    table.put("rec1", "femur")
+    snapshot = AirtableSnapshot(table, snapshot_dir=tmp_path)
+    snapshot.sync()
+    age(table, days=1)
+    table.calls.clear()
+
+    assert [r["id"] for r in snapshot.sync()] == ["rec1"]
+    assert len(table.calls) == 1
+
+
+def test_sync_can_check_for_deletions(tmp_path):
+    table = changed_table(tmp_path, check_deletions=True)
+
+    records = AirtableSnapshot(
+        table, snapshot_dir=tmp_path, check_deletions=True
+    ).sync()
+
+    assert {r["id"]: r["fields"]["name"] for r in records} == {
+        "rec1": "femur",
+        "rec2": "fibula",
+        "rec4": "radius",
+    }
+    # Only changed records are fetched in full; ids are listed with one field
+    assert table.calls[0]["formula"].startswith("IS_AFTER(LAST_MODIFIED_TIME()")
+    assert table.calls[1] == {"formula": None, "fields": ["name"]}
+
+
+def test_bases_keep_separate_snapshots(tmp_path):
+    production, staging = FakeTable("appProduction"), FakeTable("appStaging")
+    production.put("rec1", "femur")
+    staging.put("rec2", "tibia")
+
+    AirtableSnapshot(production, snapshot_dir=tmp_path).sync()
+    AirtableSnapshot(staging, snapshot_dir=tmp_path).sync()
+
+    records = AirtableSnapshot(production, snapshot_dir=tmp_path).load()["records"]
+    assert list(records) == ["rec1"]
+
+
+def test_old_snapshot_is_refetched_in_full(tmp_path):
+    table = FakeTable()
+    table.put("rec1", "femur")
+    snapshot = AirtableSnapshot(table, snapshot_dir=tmp_path)
+    snapshot.sync()
+
+    stored = snapshot.load()
+    stored["full_synced_at"] = (
+        datetime.now(timezone.utc) - timedelta(days=30)
+    ).isoformat()
+    snapshot.save(stored)
+    table.calls.clear()
+
+    snapshot.sync()
+    assert table.calls == [{"formula": None, "fields": None}]
@@ -5,7 +5,10 @@ file and asserts that `etl.extractors.csv_parser.read_csv` returns a
 pandas DataFrame with expected columns and values.
 """
 
+import datetime
+
 import pandas as pd
+import pytest
 
 from etl.extractors import csv_parser
 
@@ -30,3 +33,120 @@ def test_read_csv_from_string(tmp_path):
     assert "irn" in df.columns
     assert df.iloc[0]["irn"] == 2677267
     assert df.shape[0] >= 1
+
+
+def test_read_csv_chunks_match_full_read(tmp_path):
+    csv_file = tmp_path / "sample.csv"
+    csv_file.write_text(SAMPLE_CSV, encoding="utf-8")
+    full = csv_parser.read_csv(str(csv_file))
+
+    for engine in ("c", "pyarrow"):
+        chunks = list(csv_parser.read_csv(str(csv_file), chunksize=2, engine=engine))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+        df = pd.concat(chunks)
+        assert df["irn"].tolist() == full["irn"].tolist()
+        assert df.index.tolist() == full.index.tolist()
+        # Dates stay strings and empty fields stay empty strings
+        assert df["date_emu_record_modified"].tolist() == (
+            full["date_emu_record_modified"].tolist()
+        )
+        assert df["sex"].tolist() == [""] * 5
+
+
+def test_read_csv_pyarrow_columns_and_dtype(tmp_path):
+    csv_file = tmp_path / "sample.csv"
+    csv_file.write_text(SAMPLE_CSV, encoding="utf-8")
+
+    df = csv_parser.read_csv(
+        str(csv_file),
+        columns=["irn", "taxon_irn"],
+        dtype={"taxon_irn": str},
+        engine="pyarrow",
+    )
+    assert list(df.columns) == ["irn", "taxon_irn"]
+    assert df.iloc[0]["irn"] == 2677267
+    assert df.iloc[0]["taxon_irn"] == "8818"
+
+
+def test_read_csv_typed_engines_agree(tmp_path):
+    csv_file = tmp_path / "sample.csv"
+    csv_file.write_text(SAMPLE_CSV, encoding="utf-8")
+    dtype = {
+        "irn": "int64",
+        "date_emu_record_modified": "date32",
+        "department": "category",
+        "type_status": "category",
+    }
+
+    df = csv_parser.read_csv(str(csv_file), dtype=dtype, engine="pyarrow")
+    expected = csv_parser.read_csv(str(csv_file), dtype=dtype)
+
+    assert df["irn"].dtype == "int64"
+    assert isinstance(df["department"].dtype, pd.CategoricalDtype)
+    assert df.iloc[0]["date_emu_record_modified"] == datetime.date(2024, 6, 18)
+    for column in dtype:
+        assert df[column].tolist() == expected[column].tolist()
+
+
+def test_read_csv_pyarrow_falls_back_to_c_parser(tmp_path, monkeypatch):
+    csv_file = tmp_path / "sample.csv"
+    # The C parser skips the long row but keeps the short one; pyarrow can't
+    # pad short rows, so it hands the file over to the C parser
+    csv_file.write_text(
+        "irn,department\n"
+        + "".join(f"{i},Mammalogy\n" for i in range(20))
+        + "20,Ornithology,extra\n21\n"
+    )
+    expected = csv_parser.read_csv(str(csv_file), dtype={"irn": str})
+    assert expected["irn"].tolist()[-1] == "21"
+
+    with pytest.warns(RuntimeWarning, match="using the slower C parser"):
+        df = csv_parser.read_csv(str(csv_file), dtype={"irn": str}, engine="pyarrow")
+    assert df.equals(expected)
+
+    # When streaming, the failure is only hit in a later block
+    monkeypatch.setattr(csv_parser, "PYARROW_BLOCK_SIZE", 64)
+    chunks = csv_parser.read_csv(
+        str(csv_file), dtype={"irn": str}, chunksize=5, engine="pyarrow"
+    )
+    expected_chunks = csv_parser.read_csv(
+        str(csv_file), dtype={"irn": str}, chunksize=5
+    )
+    with pytest.warns(RuntimeWarning, match="using the slower C parser"):
+        assert pd.concat(chunks).equals(pd.concat(expected_chunks))
+
+
+def test_read_csv_pyarrow_reads_empty_typed_fields_as_null(tmp_path, monkeypatch):
+    csv_file = tmp_path / "sample.csv"
+    csv_file.write_text(
+        "irn,date_emu_record_modified,locality_irn,department\n"
+        "1,2024-06-18,916190,Mammalogy\n"
+        "2,,,Ornithology\n"
+    )
+    dtype = {
+        "irn": "int64",
+        "date_emu_record_modified": "date32",
+        "locality_irn": "int64",
+        "department": "category",
+    }
+    # Reading must not fall back to the C parser
+    monkeypatch.setattr(
+        csv_parser, "_read_csv_c", lambda *args, **kwargs: pytest.fail("fallback")
+    )
+
+    df = csv_parser.read_csv(str(csv_file), dtype=dtype, engine="pyarrow")
+    chunks = list(
+        csv_parser.read_csv(str(csv_file), dtype=dtype, chunksize=1, engine="pyarrow")
+    )
+
+    for frame in (df, pd.concat(chunks)):
+        assert frame["irn"].dtype == "int64"
+        assert frame["date_emu_record_modified"].tolist()[0] == datetime.date(
+            2024, 6, 18
+        )
+        assert pd.isna(frame["date_emu_record_modified"].tolist()[1])
+        assert frame["locality_irn"].tolist()[0] == 916190
+        assert pd.isna(frame["locality_irn"].tolist()[1])
+    # Integer columns with nulls stay integers
+    assert df["locality_irn"].dtype == "Int64"
@@ -0,0 +1,279 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from etl.transformers.anthropology import cultures as cultures_module
+from etl.transformers.anthropology import transform_anthropology_catalogue
+from etl.transformers.anthropology.cultures import Cultures
+
+CULTURE_COLUMNS = [
+    "id",
+    "name",
+    "type",
+    "region",
+    "parent_id",
+    "age_start",
+    "age_end",
+    "synonyms",
+    "endonyms",
+    "aat_id",
+    "wikidata_id",
+    "aat_notes",
+    "description",
+    "record_id",
+    "date_modified",
+]
+
+
+def make_cultures(rows):
+    """A cultures DataFrame shaped like the Airtable table, from (id, name, parent_id)."""
+    df = pd.DataFrame(
+        [{"id": cid, "name": name, "parent_id": parent} for cid, name, parent in rows],
+        columns=CULTURE_COLUMNS,
+    )
+    df["record_id"] = [f"rec{cid}" for cid, _, _ in rows]
+    return df
+
+
+def sample_cultures():
+    return Cultures(
+        make_cultures(
+            [
+                (1, "Andean", ""),
+                (2, "Chimú", 1),
+                (3, "Ica", 1),
+                (4, "Nez Perce", ""),
+                (5, "Bannock", ""),
+                (6, "Jama-Coaque", 1),
+            ]
+        )
+    )
+
+
+def test_match_parses_each_distinct_motif_once(monkeypatch):
+    cultures = sample_cultures()
+    calls = []
+    extract_terms = cultures.extract_terms
+    monkeypatch.setattr(
+        cultures,
+        "extract_terms",
+        lambda term: calls.append(term) or extract_terms(term),
+    )
+
+    motifs = ["possibly Ica", "Bannock (Banate) - Nez Perce (Nimiipuu)", "Chimu"] * 50
+    results = [sorted(cultures.match(motif)) for motif in motifs]
+
+    assert results[:3] == [[3], [4, 5], [2]]
+    assert results == results[:3] * 50
+    # "Chimu" matches a name outright and is never split into terms
+    assert calls == motifs[:2]
+
+
+def test_cached_matches_agree_and_are_not_shared():
+    cultures = sample_cultures()
+    motifs = ["Jama-Coaque", "Ica / Chimú", "unknown", "probably Andean style", ""]
+
+    for motif in motifs:
+        expected = sorted(cultures._match_motif(motif)) if motif else []
+        assert sorted(cultures.match(motif)) == expected
+        # Callers may modify the returned list without touching the cache
+        cultures.match(motif).append(99)
+        assert sorted(cultures.match(motif)) == expected
+
+    assert sorted(cultures.match_list(["Ica", "Ica", "Bannock"])) == [3, 5]
+
+
+def test_match_series_agrees_with_match_list():
+    cultures = sample_cultures()
+    # Exercise parent removal: Chimú (2) is a child of Andean (1)
+    cultures.parent_lookup = {2: 1}
+    motifs = pd.Series(
+        [
+            ["Andean", "Chimú"],
+            [],
+            ["Ica / Chimú", "Ica"],
+            ["unknown", ""],
+            ["Bannock (Banate) - Nez Perce (Nimiipuu)"],
+            ["Andean"],
+        ],
+        index=pd.Index([101, 102, 103, 104, 105, 106], name="irn"),
+    )
+
+    ids, join_df = cultures.match_series(motifs)
+
+    expected = motifs.apply(lambda m: sorted(cultures.match_list(m)))
+    assert ids.apply(sorted).tolist() == expected.tolist()
+    assert ids.index.equals(motifs.index)
+    assert list(join_df.columns) == ["irn", "cultures_id"]
+    assert sorted(join_df.itertuples(index=False, name=None)) == [
+        (101, 2),
+        (103, 2),
+        (103, 3),
+        (105, 4),
+        (105, 5),
+        (106, 1),
+    ]
+
+
+def hierarchy_cultures():
+    """Andean > Chimú > Chimú-Inca, Andean > Ica, and unrelated Bannock."""
+    return Cultures(
+        make_cultures(
+            [
+                (1, "Andean", ""),
+                (2, "Chimú", 1),
+                (3, "Ica", 1),
+                (4, "Chimú-Inca", 2),
+                (5, "Bannock", ""),
+            ]
+        )
+    )
+
+
+def test_closure_gives_ancestors_and_descendants_with_depth():
+    cultures = hierarchy_cultures()
+
+    assert sorted(cultures.get_descendant_ids(1)) == [2, 3, 4]
+    assert sorted(cultures.get_descendant_ids("2")) == [4]
+    assert cultures.get_descendant_ids(5) == []
+    assert cultures.get_ancestor_ids(4) == [2, 1]
+    assert cultures.descendants[1] == {2: 1, 3: 1, 4: 2}
+    assert cultures.ancestors[4] == {2: 1, 1: 2}
+    assert len(cultures.closure) == 4
+
+
+def test_closure_cuts_cycles():
+    cultures = Cultures(make_cultures([(1, "A", 3), (2, "B", 1), (3, "C", 2)]))
+
+    assert sorted(cultures.get_descendant_ids(1)) == [2, 3]
+    assert cultures.ancestors[1] == {3: 1, 2: 2}
+
+
+def test_match_counts_include_descendants():
+    cultures = hierarchy_cultures()
+
+    counts = cultures.match_counts(pd.Series([4, 4, 2, 3, 5, 5, 5]))
+
+    assert counts.to_dict("index") == {
+        1: {"match_count": 0, "recursive_match_count": 4},
+        2: {"match_count": 1, "recursive_match_count": 3},
+        3: {"match_count": 1, "recursive_match_count": 1},
+        4: {"match_count": 2, "recursive_match_count": 2},
+        5: {"match_count": 3, "recursive_match_count": 3},
+    }
+
+
+class FakeTable:
+    """Stands in for pyairtable's Table, recording batch_update calls."""
+
+    def __init__(self):
+        self.batches = []
+
+    def batch_update(self, records):
+        assert len(records) <= 10
+        self.batches.append(records)
+        return records
+
+
+def test_update_match_counts_sends_only_changes_in_paced_batches(monkeypatch):
+    cultures = Cultures(make_cultures([(i, f"Culture {i}", "") for i in range(1, 31)]))
+    cultures.table = FakeTable()
+    # Counts as fetched: culture 1 is up to date, 2 is stale, the rest unset
+    cultures.fetched_fields = {
+        "rec1": {"match_count": 1, "recursive_match_count": 1},
+        "rec2": {"match_count": 1, "recursive_match_count": 5},
+    }
+    sleeps = []
+    monkeypatch.setattr(cultures_module.time, "sleep", sleeps.append)
+
+    counts = cultures.match_counts(pd.Series([1, 2]))
+    updated = cultures.update_match_counts(counts)
+
+    sent = [record for batch in cultures.table.batches for record in batch]
+    assert updated == len(sent) == 29
+    assert [len(batch) for batch in cultures.table.batches] == [10, 10, 9]
+    assert "rec1" not in {record["id"] for record in sent}
+    assert sent[0] == {
+        "id": "rec2",
+        "fields": {"match_count": 1, "recursive_match_count": 1},
+    }
+    # Every request after the first waits for the rest of its interval
+    assert len(sleeps) == 2
+    assert all(0 < wait <= cultures_module.AIRTABLE_REQUEST_INTERVAL for wait in sleeps)
+
+
+def test_lookups_by_id():
+    cultures = hierarchy_cultures()
+
+    assert cultures.get_name_by_id(2) == "Chimú"
+    assert cultures.get_name_by_id("4") == "Chimú-Inca"
+    assert cultures.get_name_by_id(99) == ""
+    assert cultures.names_for_ids([3, "1", 99]) == ["Ica", "Andean", ""]
+
+    record = cultures.get_culture_by_id(2)
+    assert record["name"] == "Chimú" and record["airtable_id"] == "rec2"
+    assert cultures.get_culture_by_id(99) is None
+    # Callers get a copy of the record
+    record["name"] = "changed"
+    assert cultures.get_culture_by_id(2)["name"] == "Chimú"
+
+
+def test_transform_uses_the_given_cultures(monkeypatch):
+    def fetch(self):
+        raise AssertionError("the given Cultures should be used, not a new one")
+
+    monkeypatch.setattr(Cultures, "_fetch_airtable_data", fetch)
+    site = {"irn": "", "site_name": [{"SitSiteName": "Site"}], "site_number": ""}
+    catalogue = pd.DataFrame(
+        {
+            "irn": ["11", "12"],
+            "cultural_attribution": [[{"AntMotif": "Ica / Chimú"}], []],
+            "material_type_verbatim": [[{"AntMaterial": "clay"}], []],
+            "AntSiteRef": [[site], [site]],
+            "AntDonorRef": [[], []],
+            "AntCollectedByRef": [[], []],
+            "date_received": ["", ""],
+        }
+    )
+
+    _, join_df = transform_anthropology_catalogue(catalogue, sample_cultures())
+
+    assert sorted(join_df.itertuples(index=False, name=None)) == [(11, 2), (11, 3)]
+
+
+class SnapshotTable(FakeTable):
+    """The Airtable cultures table, whose records can change between syncs."""
+
+    name = "Anthro Cultures"
+    base = SimpleNamespace(id="appAnthro")
+
+    def __init__(self, rows):
+        super().__init__()
+        self.records = {}
+        for cid, name in rows:
+            fields = {column: "" for column in CULTURE_COLUMNS}
+            fields.update({"id": cid, "name": name, "synonyms": [], "endonyms": []})
+            fields["name (from parent_culture)"] = []
+            del fields["record_id"]
+            self.records[f"rec{cid}"] = {"id": f"rec{cid}", "fields": fields}
+
+    def all(self, formula=None, fields=None):
+        return list(self.records.values())
+
+
+def test_deleted_cultures_are_not_written_back(monkeypatch, tmp_path):
+    table = SnapshotTable([(1, "Andean"), (2, "Chimú"), (3, "Ica")])
+    monkeypatch.setattr(Cultures, "_fetch_airtable_data", lambda self: table)
+    monkeypatch.setattr(cultures_module.time, "sleep", lambda wait: None)
+    monkeypatch.setattr(
+        cultures_module.settings, "airtable_snapshot_dir", str(tmp_path)
+    )
+    Cultures(incremental=True, check_deletions=True)
+
+    del table.records["rec2"]
+    cultures = Cultures(incremental=True, check_deletions=True)
+    cultures.update_match_counts(cultures.match_counts(pd.Series([1, 3])))
+
+    assert cultures.get_name_by_id(2) == ""
+    sent = [record["id"] for batch in table.batches for record in batch]
+    assert sorted(sent) == ["rec1", "rec3"]
@@ -0,0 +1,86 @@
+import random
+
+from etl.transformers.biology.elements.elements import Elements
+from etl.transformers.utils import AhoCorasick
+
+BONES = ["femur", "tibia", "ulna", "radius", "skull", "mandible", "tooth", "vertebra"]
+
+
+def airtable_elements():
+    """Airtable-style records with nested names, shared substrings and synonyms."""
+    records = []
+    for i, bone in enumerate(BONES):
+        records.append(
+            {
+                "id": f"rec{bone}",
+                "fields": {
+                    "id": i + 1,
+                    "name": bone.capitalize(),
+                    "synonyms": [f"{bone}s", f"{bone} fragment"] if i % 2 else [],
+                    "children": ["x"] * (i % 3),
+                    "parent_name": [],
+                    "parent_id": [],
+                },
+            }
+        )
+        records.append(
+            {
+                "id": f"recproximal{bone}",
+                "fields": {
+                    "id": 100 + i,
+                    "name": f"Proximal {bone}",
+                    "synonyms": [f"prox. {bone}"],
+                    "parent_name": [bone.capitalize()],
+                    "parent_id": [i + 1],
+                },
+            }
+        )
+    records.append(
+        {"id": "recbone", "fields": {"id": 999, "name": "Bone", "children": ["x"] * 9}}
+    )
+    return records
+
+
+def naive_match(elements, element):
+    """The original Elements.match: the first lookup key contained in the string."""
+    if not element:
+        return None
+    cleaned = elements._clean_element(element)
+    for key, value in elements.lookup.items():
+        if key in cleaned:
+            return [value]
+    return []
+
+
+def test_match_agrees_with_scanning_the_lookup():
+    elements = Elements(airtable_elements())
+    rng = random.Random(0)
+    words = list(elements.lookup) + ["left", "right", "bone", "?", "partial", "r"]
+    samples = list(elements.lookup) + ["", "unknown", "Left FEMUR?"]
+    samples += [" ".join(rng.choices(words, k=rng.randint(1, 4))) for _ in range(2000)]
+
+    for sample in samples:
+        assert elements.match(sample) == naive_match(elements, sample), sample
+    assert elements.match(None) is None
+
+
+def test_automaton_finds_every_occurrence():
+    rng = random.Random(1)
+    for _ in range(200):
+        patterns = list(
+            dict.fromkeys(
+                "".join(rng.choices("ab", k=rng.randint(1, 4))) for _ in range(6)
+            )
+        )
+        text = "".join(rng.choices("ab", k=12))
+        matcher = AhoCorasick(patterns)
+
+        expected = sorted(
+            (end, rank)
+            for rank, pattern in enumerate(patterns)
+            for end in range(len(pattern), len(text) + 1)
+            if text[end - len(pattern) : end] == pattern
+        )
+        assert sorted(matcher.iter_matches(text)) == expected
+        ranks = [rank for _, rank in expected]
+        assert matcher.first_match(text) == (min(ranks) if ranks else None)
@@ -0,0 +1,88 @@
+"""Tests for the on-disk extract cache.
+
+These check that `etl.extractors.cache` returns exactly what the wrapped
+extractors return, serves unchanged exports from disk, notices changed
+exports and trims itself to its size limit.
+"""
+
+import os
+
+import pytest
+
+from etl.extractors import cache as extract_cache
+from etl.extractors import xml_parser
+
+from test_csv_parser import SAMPLE_CSV
+from test_xml_parser import SAMPLE_XML
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return extract_cache.ExtractCache(cache_dir=str(tmp_path / "cache"))
+
+
+def test_cached_xml_to_json_round_trip(tmp_path, cache, monkeypatch):
+    f = tmp_path / "sample.xml"
+    f.write_text(SAMPLE_XML, encoding="utf-8")
+    expected = xml_parser.xml_to_json(str(f))
+
+    assert extract_cache.cached_xml_to_json(str(f), cache=cache) == expected
+
+    # Second call must be served from the cache without parsing
+    def fail(*args, **kwargs):
+        raise AssertionError("export was parsed again")
+
+    monkeypatch.setattr(extract_cache, "xml_to_json", fail)
+    assert extract_cache.cached_xml_to_json(str(f), cache=cache) == expected
+
+
+def test_cached_read_csv_round_trip_and_params(tmp_path, cache, monkeypatch):
+    f = tmp_path / "sample.csv"
+    f.write_text(SAMPLE_CSV, encoding="utf-8")
+
+    df = extract_cache.cached_read_csv(str(f), cache=cache, columns=["irn", "sex"])
+    assert list(df.columns) == ["irn", "sex"]
+
+    calls = []
+    real_read_csv = extract_cache.read_csv
+    monkeypatch.setattr(
+        extract_cache,
+        "read_csv",
+        lambda *args, **kwargs: calls.append(kwargs) or real_read_csv(*args, **kwargs),
+    )
+
+    cached = extract_cache.cached_read_csv(str(f), cache=cache, columns=["irn", "sex"])
+    assert calls == []
+    assert cached.equals(df)
+
+    # Different arguments are a different entry
+    extract_cache.cached_read_csv(str(f), cache=cache, columns=["irn"])
+    assert len(calls) == 1
+
+
+def test_changed_export_is_a_miss(tmp_path, cache):
+    f = tmp_path / "sample.xml"
+    f.write_text(SAMPLE_XML, encoding="utf-8")
+    extract_cache.cached_xml_to_json(str(f), cache=cache)
+
+    # Touching the file without changing it keeps the entry valid
+    stat = os.stat(f)
+    os.utime(f, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.get("xml_to_json", str(f), {}) is not None
+
+    # Same size, different content
+    f.write_text(SAMPLE_XML.replace("531077", "531078"), encoding="utf-8")
+    assert cache.get("xml_to_json", str(f), {}) is None
+    rows = extract_cache.cached_xml_to_json(str(f), cache=cache)
+    assert rows[0]["irn"] == "531078"
+
+
+def test_eviction_keeps_cache_under_max_bytes(tmp_path):
+    cache = extract_cache.ExtractCache(cache_dir=str(tmp_path / "cache"), max_bytes=1)
+    for name in ("a.csv", "b.csv"):
+        f = tmp_path / name
+        f.write_text(SAMPLE_CSV, encoding="utf-8")
+        extract_cache.cached_read_csv(str(f), cache=cache)
+
+    # Every entry is larger than 1 byte, so nothing survives eviction
+    assert list((tmp_path / "cache").glob("*.arrow")) == []
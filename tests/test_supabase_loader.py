@@ -0,0 +1,544 @@
+"""Tests for the Supabase loader.
+
+A small PostgREST-like HTTP server runs in a background thread. It answers
+inserts/upserts on /rest/v1/<table> after an artificial delay, echoes the
+rows back with created_at/updated_at, and tracks how many requests were in
+flight at once. Faults can be injected: a number of 503s or 504s before the
+first success, 413s for requests with too many rows or with one too-large
+row, and a 400 for requests with one bad row.
+
+The join table (catalogue_irn, culture_id) is kept in memory and supports
+the reads, upserts and deletes sync_join_table makes, including the
+delete_join_pairs function (which can be switched off with rpc=False).
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+from postgrest.exceptions import APIError
+
+from config.settings import settings
+from etl.loaders.manifest import row_hashes
+from etl.loaders import supabase_loader
+from etl.loaders.supabase_loader import SupabaseLoader, _chunk_ranges, _encode_row
+
+JOIN_TABLE = "anthropology_catalogue_cultures"
+SOURCE, TARGET = "catalogue_irn", "culture_id"
+KEYSET = re.compile(
+    rf"\({SOURCE}\.gt\.(\d+),and\({SOURCE}\.eq\.(\d+),{TARGET}\.gt\.(\d+)\)\)"
+)
+
+
+class StubPostgrest(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency=0.05,
+        fail_irn=None,
+        unavailable=0,
+        gateway_timeouts=0,
+        max_rows=None,
+        too_large_irn=None,
+        rpc=True,
+    ):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.fail_irn = fail_irn
+        self.unavailable = unavailable
+        self.gateway_timeouts = gateway_timeouts
+        self.too_large_irn = too_large_irn
+        self.max_rows = max_rows
+        self.rpc = rpc
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self.relations = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def join_filters(self):
+        """Parses the eq./in. filters and keyset condition of a join table request."""
+        filters, after, limit = {}, None, None
+        for name, value in parse_qsl(urlsplit(self.path).query):
+            if name in (SOURCE, TARGET):
+                operator, _, operand = value.partition(".")
+                values = (
+                    operand.strip("()").split(",") if operator == "in" else [operand]
+                )
+                filters[name] = {int(v) for v in values}
+            elif name == "or":
+                source, _, target = KEYSET.fullmatch(value).groups()
+                after = (int(source), int(target))
+            elif name == "limit":
+                limit = int(value)
+        return filters, after, limit
+
+    def matching_relations(self, filters):
+        return sorted(
+            (source, target)
+            for source, target in self.server.relations
+            if source in filters.get(SOURCE, [source])
+            and target in filters.get(TARGET, [target])
+        )
+
+    def do_GET(self):
+        filters, after, limit = self.join_filters()
+        relations = self.matching_relations(filters)
+        if after is not None:
+            relations = [relation for relation in relations if relation > after]
+        body = [{SOURCE: s, TARGET: t} for s, t in relations[:limit]]
+        self.send_json(200, body)
+
+    def do_DELETE(self):
+        filters, _, _ = self.join_filters()
+        with self.server.lock:
+            deleted = self.matching_relations(filters)
+            self.server.relations.difference_update(deleted)
+            self.server.requests.append((self.path, None))
+        self.send_json(
+            200,
+            [{SOURCE: s, TARGET: t} for s, t in deleted],
+            {"Content-Range": f"*/{len(deleted)}"},
+        )
+
+    def delete_join_pairs(self, params):
+        if not self.server.rpc:
+            body = {
+                "code": "PGRST202",
+                "message": "Could not find the function",
+                "details": None,
+                "hint": None,
+            }
+            return self.send_json(404, body)
+        pairs = set(zip(params["sources"], params["targets"]))
+        with self.server.lock:
+            deleted = pairs & self.server.relations
+            self.server.relations -= deleted
+            self.server.requests.append((self.path, params))
+        self.send_json(200, len(deleted))
+
+    def do_POST(self):
+        server = self.server
+        rows = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if urlsplit(self.path).path.endswith("/rpc/delete_join_pairs"):
+            return self.delete_join_pairs(rows)
+        if urlsplit(self.path).path.endswith(JOIN_TABLE):
+            with server.lock:
+                server.relations.update((row[SOURCE], row[TARGET]) for row in rows)
+                server.requests.append((self.path, rows))
+            return self.send_json(201, rows)
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests.append((self.path, rows))
+        time.sleep(server.latency)
+        with server.lock:
+            server.in_flight -= 1
+
+        with server.lock:
+            unavailable = server.unavailable > 0
+            server.unavailable -= unavailable
+        if unavailable:
+            return self.send_text(503, b"Service Unavailable")
+        with server.lock:
+            gateway_timeout = server.gateway_timeouts > 0
+            server.gateway_timeouts -= gateway_timeout
+        if gateway_timeout:
+            return self.send_text(504, b"Gateway Timeout")
+        if server.max_rows and len(rows) > server.max_rows:
+            return self.send_text(413, b"Payload Too Large")
+        if any(row.get("irn") == server.too_large_irn for row in rows):
+            return self.send_text(413, b"Payload Too Large")
+
+        if any(row.get("irn") == server.fail_irn for row in rows):
+            status = 400
+            body = {"message": "invalid input", "code": "22P02"}
+        else:
+            status = 201
+            # Even irns are new rows, odd ones already existed
+            body = [
+                {
+                    **row,
+                    "created_at": "2024-01-01T00:00:00+00:00",
+                    "updated_at": "2024-01-0%dT00:00:00+00:00" % (1 + row["irn"] % 2),
+                }
+                for row in rows
+            ]
+            select = dict(parse_qsl(urlsplit(self.path).query)).get("select")
+            if select:
+                columns = select.split(",")
+                body = [{column: row[column] for column in columns} for row in body]
+
+        self.send_json(status, body)
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_text(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub_server(request):
+    server = StubPostgrest(**getattr(request, "param", {}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_rows(n):
+    return [{"irn": i, "department": "Mammalogy"} for i in range(1, n + 1)]
+
+
+def test_insert_rows_concurrently_keeps_order_and_counts(stub_server):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key")
+
+    results, operations = loader.insert_rows(
+        "biology_catalogue",
+        make_rows(95),
+        upsert=True,
+        chunk_size=10,
+        max_in_flight=4,
+    )
+
+    assert [row["irn"] for row in results] == list(range(1, 96))
+    assert operations == {"inserted": 47, "updated": 48}
+    assert len(stub_server.requests) == 10
+    assert 1 < stub_server.max_in_flight <= 4
+
+
+def test_insert_rows_is_sequential_by_default(stub_server):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key")
+
+    results, _ = loader.insert_rows("biology_catalogue", make_rows(30), chunk_size=10)
+
+    assert len(results) == 30
+    assert stub_server.max_in_flight == 1
+    assert stub_server.requests[0][0].startswith("/rest/v1/biology_catalogue")
+
+
+# Windows hold chunk_size * (max_in_flight + 1) = 50 rows: irn 42 fails in
+# the first window, irn 73 in the second
+@pytest.mark.parametrize(
+    "stub_server, start",
+    [({"fail_irn": 42}, 40), ({"fail_irn": 73}, 70)],
+    indirect=["stub_server"],
+)
+def test_insert_rows_reports_failing_chunk(stub_server, start, capsys):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key")
+
+    with pytest.raises(APIError):
+        loader.insert_rows(
+            "biology_catalogue",
+            make_rows(100),
+            upsert=True,
+            chunk_size=10,
+            max_in_flight=4,
+        )
+
+    output = capsys.readouterr().out
+    assert f"Chunk index start={start} size=10" in output
+    # The sample payload is the failing chunk's first rows
+    assert f'"irn": {start + 1},' in output
+
+
+def test_chunk_ranges_respect_rows_and_bytes():
+    sizes = [10, 10, 10, 50, 10, 10]
+    assert _chunk_ranges(sizes, max_rows=4, max_bytes=1000) == [(0, 4), (4, 6)]
+    assert _chunk_ranges(sizes, max_rows=10, max_bytes=30) == [
+        (0, 3),
+        (3, 4),
+        (4, 6),
+    ]
+
+
+@pytest.mark.parametrize("stub_server", [{"unavailable": 2}], indirect=True)
+def test_insert_rows_retries_transient_errors(stub_server, capsys):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key", retry_backoff=0)
+
+    results, _ = loader.insert_rows("biology_catalogue", make_rows(30), chunk_size=10)
+
+    assert [row["irn"] for row in results] == list(range(1, 31))
+    assert len(stub_server.requests) == 5
+    assert "0 splits, 2 retries" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("stub_server", [{"max_rows": 3}], indirect=True)
+def test_insert_rows_splits_oversized_chunks(stub_server, capsys):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key", retry_backoff=0)
+
+    results, _ = loader.insert_rows(
+        "biology_catalogue", make_rows(20), chunk_size=10, max_in_flight=2
+    )
+
+    assert [row["irn"] for row in results] == list(range(1, 21))
+    output = capsys.readouterr().out
+    # 10 -> 5 + 5 -> (2 + 3) + (2 + 3), twice
+    assert "Chunk rows min/median/max: 2/2/3" in output
+    assert "6 splits, 0 retries" in output
+
+
+@pytest.mark.parametrize("stub_server", [{"too_large_irn": 3}], indirect=True)
+def test_insert_rows_fails_at_once_on_a_too_large_row(stub_server):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key", retry_backoff=0)
+
+    with pytest.raises(APIError):
+        loader.insert_rows("biology_catalogue", make_rows(10), chunk_size=10)
+
+    # 1-10 -> 1-5 -> 3-5 -> 3, which is not resent
+    sent = [[row["irn"] for row in rows] for _, rows in stub_server.requests]
+    assert [irns for irns in sent if 3 in irns] == [
+        list(range(1, 11)),
+        [1, 2, 3, 4, 5],
+        [3, 4, 5],
+        [3],
+    ]
+
+
+@pytest.mark.parametrize("stub_server", [{"gateway_timeouts": 1}], indirect=True)
+@pytest.mark.parametrize("upsert", [False, True])
+def test_gateway_timeouts_are_only_resent_for_upserts(stub_server, upsert):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key", retry_backoff=0)
+
+    if upsert:
+        results, _ = loader.insert_rows(
+            "biology_catalogue", make_rows(10), upsert=True, chunk_size=10
+        )
+        assert [row["irn"] for row in results] == list(range(1, 11))
+        # The chunk is split in halves, which are sent again
+        assert len(stub_server.requests) == 3
+    else:
+        # A plain insert may have been written before the gateway gave up
+        with pytest.raises(APIError):
+            loader.insert_rows("biology_catalogue", make_rows(10), chunk_size=10)
+        assert len(stub_server.requests) == 1
+
+
+def test_only_unsent_requests_are_resent_for_plain_inserts():
+    request = httpx.Request("POST", "http://localhost/rest/v1/t")
+    unsent = httpx.ConnectError("refused", request=request)
+    lost = httpx.ReadTimeout("timed out", request=request)
+
+    assert supabase_loader._should_retry(unsent, idempotent=False)
+    assert not supabase_loader._should_split(unsent, idempotent=True)
+    assert not supabase_loader._should_retry(lost, idempotent=False)
+    assert not supabase_loader._should_split(lost, idempotent=False)
+    assert supabase_loader._should_retry(lost, idempotent=True)
+    assert supabase_loader._should_split(lost, idempotent=True)
+
+
+def test_row_hashes_are_stable_and_content_based():
+    df = pd.DataFrame(
+        {"irn": [1, 2], "name": ["a", "b"], "synonyms": [["x"], []]},
+    )
+    hashes = row_hashes(df)
+
+    assert row_hashes(df[["synonyms", "name", "irn"]]).tolist() == hashes.tolist()
+    changed = df.assign(synonyms=[["x"], ["y"]])
+    assert (row_hashes(changed) == hashes).tolist() == [True, False]
+    # A new column changes every row
+    assert not (row_hashes(df.assign(side="")) == hashes).any()
+
+
+def test_row_hashes_only_encode_columns_with_lists_or_dicts(monkeypatch):
+    df = pd.DataFrame(
+        {
+            "name": pd.Series(["a", None, "c"], dtype=object),
+            "count": [1, 2, 3],
+            "mixed": pd.Series([1, "b", None], dtype=object),
+            "synonyms": [["x"], [], None],
+            "details": [{"b": 1, "a": 2}, None, {"c": [1]}],
+        }
+    )
+    expected = row_hashes(df)
+    mapped = []
+    series_map = pd.Series.map
+    monkeypatch.setattr(
+        pd.Series,
+        "map",
+        lambda self, *a, **k: mapped.append(self.name) or series_map(self, *a, **k),
+    )
+
+    assert row_hashes(df).tolist() == expected.tolist()
+    # Plain text columns are hashed without a pass over their values
+    assert mapped == ["details", "mixed", "synonyms"]
+    # Key order inside JSON values doesn't matter
+    reordered = df.assign(details=[{"a": 2, "b": 1}, None, {"c": [1]}])
+    assert row_hashes(reordered).tolist() == expected.tolist()
+
+
+def test_delta_load_only_sends_changed_rows(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "load_manifest_dir", str(tmp_path))
+    loader = SupabaseLoader(url=stub_server.url, key="test-key")
+    df = pd.DataFrame(make_rows(50))
+
+    _, operations = loader.load_dataframe(
+        "biology_catalogue", df, upsert=True, chunk_size=10, delta=True
+    )
+    assert operations["unchanged"] == 0
+    assert len(stub_server.requests) == 5
+
+    df.loc[df["irn"] == 7, "department"] = "Ornithology"
+    df = pd.concat([df, pd.DataFrame(make_rows(52)[50:])], ignore_index=True)
+    stub_server.requests.clear()
+
+    results, operations = loader.load_dataframe(
+        "biology_catalogue",
+        df,
+        upsert=True,
+        chunk_size=10,
+        delta=True,
+        return_rows=True,
+    )
+    assert [row["irn"] for row in results] == [7, 51, 52]
+    assert operations["unchanged"] == 49
+    assert len(stub_server.requests) == 1
+
+
+def test_dataframe_rows_encode_like_the_records_path():
+    df = pd.DataFrame(
+        {
+            "irn": [1, 2, 3],
+            "weight": [1.5, np.nan, 2.0],
+            "taxon_irn": pd.array([7, None, 9], dtype="Int64"),
+            "name": ["femur", None, "ulna"],
+            "modified": pd.to_datetime(["2024-06-18", None, "2023-04-07"]),
+            "synonyms": [["a", np.nan], [], None],
+            "extra": [{"x": np.nan}, {}, {"y": 1}],
+        }
+    )
+    loader = SupabaseLoader.__new__(SupabaseLoader)
+
+    expected = [
+        {key: loader._replace_nan_with_none(value) for key, value in row.items()}
+        for row in df.to_dict("records")
+    ]
+    rows = loader._dataframe_to_rows(df)
+
+    assert [json.loads(_encode_row(row)) for row in rows] == [
+        json.loads(json.dumps(row, default=str)) for row in expected
+    ]
+    # The frame itself is left untouched
+    assert np.isnan(df.loc[1, "weight"])
+
+
+def test_load_dataframe_streams_and_spills_ids(stub_server, tmp_path):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key")
+    df = pd.DataFrame(make_rows(95))
+    spill_path = tmp_path / "ids.csv"
+
+    results, operations = loader.load_dataframe(
+        "biology_catalogue",
+        df,
+        upsert=True,
+        chunk_size=10,
+        max_in_flight=3,
+        spill_path=str(spill_path),
+        spill_columns=["irn", "created_at"],
+    )
+
+    # Only counts are kept by default; returned keys go to the spill file
+    assert results == []
+    assert "select=irn%2Ccreated_at%2Cupdated_at" in stub_server.requests[0][0]
+    assert operations == {"inserted": 47, "updated": 48}
+    spilled = pd.read_csv(spill_path)
+    assert spilled["irn"].tolist() == list(range(1, 96))
+    assert list(spilled.columns) == ["irn", "created_at"]
+    assert len(stub_server.requests) == 10
+
+
+@pytest.mark.parametrize(
+    "stub_server, deletes", [({}, 1), ({"rpc": False}, 2)], indirect=["stub_server"]
+)
+def test_sync_join_table_pages_past_the_row_limit(stub_server, deletes, monkeypatch):
+    monkeypatch.setattr(supabase_loader, "JOIN_PAGE_SIZE", 4)
+    loader = SupabaseLoader(url=stub_server.url, key="test-key")
+    # Catalogue record 1 has more relations than fit in one page
+    stub_server.relations = {(1, t) for t in range(1, 11)} | {(2, 1), (2, 2), (3, 1)}
+    join_df = pd.DataFrame(
+        {
+            SOURCE: [1] * 8 + [2, 2, 2, 2, None],
+            TARGET: [1, 2, 3, 4, 5, 6, 7, 11] + [2, 3, 3, 4, 1],
+        }
+    )
+
+    operations = loader.sync_join_table(
+        JOIN_TABLE, join_df, SOURCE, TARGET, chunk_size=4
+    )
+
+    desired = {(1, t) for t in [1, 2, 3, 4, 5, 6, 7, 11]} | {(2, 2), (2, 3), (2, 4)}
+    # Catalogue record 3 isn't in join_df, so its relations are left alone
+    assert stub_server.relations == desired | {(3, 1)}
+    assert operations == {"added": 3, "removed": 4}
+    inserts = [rows for path, rows in stub_server.requests if isinstance(rows, list)]
+    assert sorted(tuple(row.values()) for rows in inserts for row in rows) == [
+        (1, 11),
+        (2, 3),
+        (2, 4),
+    ]
+    # Stale pairs go in one bulk call, or one DELETE per catalogue record
+    assert len(stub_server.requests) - 1 == deletes
+
+
+def test_counts_only_request_just_the_timestamps(stub_server):
+    loader = SupabaseLoader(url=stub_server.url, key="test-key")
+
+    results, operations = loader.insert_rows(
+        "biology_catalogue",
+        make_rows(30),
+        upsert=True,
+        chunk_size=10,
+        return_rows=False,
+    )
+
+    assert results == []
+    assert operations == {"inserted": 15, "updated": 15}
+    assert all(
+        "select=created_at%2Cupdated_at" in path for path, _ in stub_server.requests
+    )
+
+
+def test_loaders_share_one_http_client_per_timeout(stub_server):
+    first = SupabaseLoader(url=stub_server.url, key="test-key", timeout=123)
+    second = SupabaseLoader(url=stub_server.url, key="test-key", timeout=123)
+    other = SupabaseLoader(url=stub_server.url, key="test-key", timeout=45)
+
+    assert first.http_client is second.http_client
+    assert first.client.postgrest.session is first.http_client
+    assert first.http_client.timeout == httpx.Timeout(123)
+    assert other.http_client is not first.http_client
+    assert other.http_client.timeout == httpx.Timeout(45)
+
+    first.insert_rows("biology_catalogue", make_rows(5))
+    second.insert_rows("biology_catalogue", make_rows(5))
+    assert len(stub_server.requests) == 2
@@ -6,6 +6,11 @@ related helpers.
 """
 
 import textwrap
+import xml.etree.ElementTree as ET
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
 
 from etl.extractors import xml_parser
 
@@ -120,3 +125,102 @@ def test_xml_to_json_with_real_sample(tmp_path):
     cg = r1.get("CreatorGroup", [])[0]
     assert cg.get("creator") == "Westinghouse Electric Corporation"
     assert cg.get("CreRole") == "Manufacturer"
+
+
+def test_iter_records_streams_same_rows(tmp_path):
+    f = tmp_path / "sample.xml"
+    f.write_text(SAMPLE_XML, encoding="utf-8")
+
+    records = xml_parser.iter_records(str(f))
+    # Generator, not a list: records are produced one at a time
+    assert not isinstance(records, list)
+
+    first = next(records)
+    assert first.get("irn") == "531077"
+
+    rows = [first, *records]
+    assert rows == xml_parser.xml_to_json(str(f))
+
+
+def test_extract_schema_from_pi_matches_full_read(tmp_path):
+    f = tmp_path / "sample.xml"
+    f.write_text(SAMPLE_XML, encoding="utf-8")
+
+    schema_text = xml_parser.extract_schema_from_pi(str(f))
+    expected = SAMPLE_XML.split("<?schema", 1)[1].split("?>", 1)[0]
+    assert schema_text == expected
+
+    schema = xml_parser.parse_schema(schema_text)
+    assert schema["CreatorGroup"] == {"fields": ["creator", "CreRole"]}
+
+
+def test_missing_schema_raises(tmp_path):
+    f = tmp_path / "no_schema.xml"
+    f.write_text(
+        '<table name="ecatalogue"><tuple><atom name="irn">1</atom></tuple></table>',
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValueError):
+        xml_parser.extract_schema_from_pi(str(f))
+    with pytest.raises(ValueError):
+        xml_parser.xml_to_json(str(f))
+
+
+def test_compile_schema_matches_dict_schema(tmp_path):
+    f = tmp_path / "sample.xml"
+    f.write_text(SAMPLE_XML, encoding="utf-8")
+    schema = xml_parser.parse_schema(xml_parser.extract_schema_from_pi(str(f)))
+
+    plan = xml_parser.compile_schema(schema)
+    assert plan.tables["CreatorGroup"].fields == ("creator", "CreRole")
+    assert plan.tables["subjects"].single == "SubSubjects"
+    with pytest.raises(TypeError):
+        plan.tables["new"] = plan  # type: ignore[index]
+
+    # Parsing with the compiled plan gives the same record as the dict schema
+    tree = ET.parse(str(f))
+    for elem in tree.getroot().findall("tuple"):
+        expected = xml_parser.parse_tuple(elem, schema)
+        assert xml_parser.parse_tuple(elem, plan) == expected
+        assert expected["subjects"] == []
+        assert "creator" in expected["CreatorGroup"][0]
+
+
+def test_parallel_parse_matches_serial(tmp_path, monkeypatch):
+    f = tmp_path / "sample.xml"
+    f.write_text(SAMPLE_XML, encoding="utf-8")
+
+    # Force one record per shard so both rows go through separate workers; the
+    # last shard holds only the whitespace before the closing </table>
+    monkeypatch.setattr(xml_parser, "_SHARD_BYTES", 1)
+    shards = list(xml_parser.iter_shards(str(f), shard_bytes=1))
+    assert len(shards) == 3
+    assert [end for _, end in shards[:-1]] == [start for start, _ in shards[1:]]
+    assert f.read_bytes()[shards[-1][1] :].startswith(b"</table>")
+
+    serial = xml_parser.xml_to_json(str(f))
+    assert xml_parser.xml_to_json(str(f), workers=2) == serial
+
+
+def test_xml_to_arrow_types_and_values(tmp_path):
+    f = tmp_path / "sample.xml"
+    f.write_text(SAMPLE_XML, encoding="utf-8")
+
+    table = xml_parser.xml_to_arrow(str(f), batch_size=1)
+    assert table.num_rows == 2
+    assert table.schema.field("irn").type == pa.string()
+    assert table.schema.field("CreatorGroup").type == pa.list_(
+        pa.struct([("creator", pa.string()), ("CreRole", pa.string())])
+    )
+
+    rows = table.to_pylist()
+    assert rows[0]["irn"] == "531077"
+    assert rows[0]["CreatorGroup"] is None
+    assert rows[1]["CreatorGroup"] == [
+        {"creator": "Westinghouse Electric Corporation", "CreRole": "Manufacturer"}
+    ]
+
+    out = tmp_path / "sample.parquet"
+    assert xml_parser.xml_to_parquet(str(f), str(out), batch_size=1) == 2
+    assert pq.read_table(out).equals(table)